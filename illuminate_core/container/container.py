@@ -1,14 +1,32 @@
 import inspect
+import os
+import threading
+import weakref
+from contextlib import contextmanager
 from inspect import Signature, Parameter
-from typing import Dict, List, Callable, Any, Optional, Union
+from typing import Dict, Iterator, List, Callable, Any, Optional, Set, Union
 
 from illuminate_core.support.utils import call_user_func
 from illuminate_core.contract.container import Container as ContainerInterface, ContextualBindingBuilder as ContextualBindingBuilderInterface
 from illuminate_core.container import bound
 from .builder import ContextualBindingBuilder
-from .exception import BindingResolutionException, EntryNotFoundException
+from .exception import BindingResolutionException, EntryNotFoundException, FrozenContainerException
+from .frozen import freeze_gc, freeze_table, thaw_table, unfreeze_gc
+from .memo import MemoCache
+from .pool import ObjectPool
 from .types import ClassAnnotation, Abstract, Concrete, Parameters
 
+_containers = weakref.WeakSet()
+
+
+def _reinitialize_containers_after_fork() -> None:
+    for container in list(_containers):
+        container.reinitialize_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinitialize_containers_after_fork)
+
 
 class Container(ContainerInterface):
     _resolved: Dict[ClassAnnotation, bool]
@@ -18,6 +36,7 @@ class Container(ContainerInterface):
     aliases: Dict[ClassAnnotation, ClassAnnotation]
     abstractAliases: Dict[ClassAnnotation, List[ClassAnnotation]]
     extenders: Dict[ClassAnnotation, List[Callable[[Any, ContainerInterface], Any]]]
+    extenderPipelines: Dict[ClassAnnotation, Callable[[Any, ContainerInterface], Any]]
     tags: Dict[Any, List[ClassAnnotation]]
     buildStack: List[str]
     withParameters: List[Parameters]
@@ -27,6 +46,19 @@ class Container(ContainerInterface):
     resolvingCallbacks: Dict[str, List[Callable]]
     afterResolvingCallbacks: Dict[str, List[Callable]]
     contextual: Dict[Concrete, Dict[ClassAnnotation, Union[ClassAnnotation, Callable]]]
+    frozen: bool = False
+    gcFrozen: bool = False
+    invalidationMode: Optional[str] = None
+    dependencies: Dict[ClassAnnotation, Set[ClassAnnotation]]
+    dependents: Dict[ClassAnnotation, Set[ClassAnnotation]]
+    dependencyStack: List[Set[ClassAnnotation]]
+    batchDepth: int = 0
+    pendingRebounds: Dict[ClassAnnotation, bool]
+    forkCallbacks: List[Callable[[ContainerInterface], Any]]
+    forkScoped: List[ClassAnnotation]
+    pools: Dict[ClassAnnotation, ObjectPool]
+    poolBuilds: Set[ClassAnnotation]
+    memoized: Dict[ClassAnnotation, MemoCache]
 
     def __init__(self):
         self._resolved: Dict[ClassAnnotation, bool] = {}
@@ -36,6 +68,7 @@ class Container(ContainerInterface):
         self.aliases: Dict[ClassAnnotation, ClassAnnotation] = {}
         self.abstractAliases: Dict[ClassAnnotation, List[ClassAnnotation]] = {}
         self.extenders: Dict[ClassAnnotation, List[Callable[[Any, ContainerInterface], Any]]] = {}
+        self.extenderPipelines: Dict[ClassAnnotation, Callable[[Any, ContainerInterface], Any]] = {}
         self.tags: Dict[Any, List[ClassAnnotation]] = {}
         self.buildStack: List[str] = []
         self.withParameters: List[Parameters] = []
@@ -45,6 +78,19 @@ class Container(ContainerInterface):
         self.resolvingCallbacks: Dict[str, List[Callable]] = {}
         self.afterResolvingCallbacks: Dict[str, List[Callable]] = {}
         self.contextual: Dict[Concrete, Dict[ClassAnnotation, Union[ClassAnnotation, Callable]]] = {}
+        self._lock = threading.RLock()
+        self.forkCallbacks: List[Callable[[ContainerInterface], Any]] = []
+        self.forkScoped: List[ClassAnnotation] = []
+        self.dependencies: Dict[ClassAnnotation, Set[ClassAnnotation]] = {}
+        self.dependents: Dict[ClassAnnotation, Set[ClassAnnotation]] = {}
+        self.dependencyStack: List[Set[ClassAnnotation]] = []
+        self.pendingRebounds: Dict[ClassAnnotation, bool] = {}
+        self.pools: Dict[ClassAnnotation, ObjectPool] = {}
+        self.poolBuilds: Set[ClassAnnotation] = set()
+        self.poolScopes = threading.local()
+        self.resolution = threading.local()
+        self.memoized: Dict[ClassAnnotation, MemoCache] = {}
+        _containers.add(self)
 
     def when(self, concrete: ClassAnnotation) -> ContextualBindingBuilderInterface:
         """
@@ -56,7 +102,7 @@ class Container(ContainerInterface):
         """
         Determine if the given abstract type has been bound.
         """
-        return abstract in self.bindings or abstract in self.instances or self.is_alias(abstract)
+        return abstract in self.bindings or abstract in self.instances or abstract in self.pools or self.is_alias(abstract)
 
     def has(self, name: ClassAnnotation) -> bool:
         return self.bound(name)
@@ -91,8 +137,15 @@ class Container(ContainerInterface):
         """
         Register a binding with the container.
         """
+        self.assert_not_frozen()
         self.drop_stale_instances(abstract)
 
+        if abstract in self.pools:
+            self.pools.pop(abstract).clear()
+
+        if abstract in self.memoized:
+            self.memoized[abstract].clear()
+
         if concrete is None:
             concrete = abstract
 
@@ -104,6 +157,8 @@ class Container(ContainerInterface):
             'shared': shared
         }
 
+        self.invalidate(abstract)
+
         if abstract in self._resolved:
             self.rebound(abstract)
 
@@ -170,31 +225,185 @@ class Container(ContainerInterface):
         """
         self.bind(abstract, concrete, True)
 
+    def pooled(
+            self,
+            abstract: ClassAnnotation,
+            factory: Optional[Union[ClassAnnotation, Callable]] = None,
+            max_size: int = 8,
+            **options
+    ) -> ObjectPool:
+        """
+        Register a binding whose instances are reused from a bounded pool.
+
+        Pooled instances are built like transient ones, then handed out by
+        borrow() or, inside a pool_scope(), by make(). The options (validate,
+        reset, dispose, block, timeout) are passed on to the ObjectPool.
+        """
+        self.assert_not_frozen()
+        self.bind(abstract, factory)
+        self.pools[abstract] = ObjectPool(lambda: self.build_pooled(abstract), max_size, **options)
+
+        return self.pools[abstract]
+
+    def build_pooled(self, abstract: ClassAnnotation) -> Any:
+        with self._lock:
+            self.poolBuilds.add(abstract)
+            try:
+                return self._resolve(abstract, [])
+            finally:
+                self.poolBuilds.discard(abstract)
+
+    def get_pool(self, abstract: ClassAnnotation) -> ObjectPool:
+        abstract = self.get_alias(abstract)
+
+        if abstract not in self.pools:
+            raise BindingResolutionException("Target [{0}] is not pooled.".format(abstract))
+
+        return self.pools[abstract]
+
+    @contextmanager
+    def borrow(self, abstract: ClassAnnotation, block: Optional[bool] = None, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Borrow an instance of a pooled type, giving it back on exit.
+        """
+        with self.get_pool(abstract).borrow(block, timeout) as instance:
+            yield instance
+
+    @contextmanager
+    def pool_scope(self) -> Iterator[ContainerInterface]:
+        """
+        Let make() hand out pooled instances, one per type, until the scope exits.
+        """
+        scopes = self.get_pool_scopes()
+        scopes.append({})
+        try:
+            yield self
+        finally:
+            error = None
+            for abstract, instance in scopes.pop().items():
+                try:
+                    self.pools[abstract].release(instance)
+                except Exception as e:
+                    error = error or e
+
+            if error is not None:
+                raise error
+
+    def get_pool_scopes(self) -> List[Dict[ClassAnnotation, Any]]:
+        if not hasattr(self.poolScopes, 'stack'):
+            self.poolScopes.stack = []
+        return self.poolScopes.stack
+
+    def resolve_pooled(self, abstract: ClassAnnotation, block: Optional[bool] = None) -> Any:
+        """
+        Hand out the pooled instance of the current scope.
+
+        While the container lock is held the pool is never waited on, since
+        the thread holding a borrowed instance may need the lock to give it back.
+        """
+        scopes = self.get_pool_scopes()
+        if len(scopes) == 0:
+            raise BindingResolutionException(
+                "Target [{0}] is pooled, borrow it or resolve it inside a pool scope.".format(abstract)
+            )
+
+        scope = scopes[-1]
+        if abstract not in scope:
+            scope[abstract] = self.pools[abstract].acquire(block)
+
+        return scope[abstract]
+
+    def get_pool_stats(self) -> Dict[ClassAnnotation, Dict[str, int]]:
+        return {abstract: pool.get_stats() for abstract, pool in self.pools.items()}
+
+    def memoize(self, abstract: ClassAnnotation, max_size: int = 128, ttl: Optional[float] = None, **options) -> MemoCache:
+        """
+        Reuse the instances built for the given type with the same override parameters.
+
+        Without parameters the binding resolves as before; with hashable
+        parameters the built instance is cached in an LRU of max_size entries,
+        each living for ttl seconds when one is given.
+        """
+        self.assert_not_frozen()
+        abstract = self.get_alias(abstract)
+        self.memoized[abstract] = MemoCache(max_size, ttl, **options)
+
+        return self.memoized[abstract]
+
+    def get_memo_key(self, abstract: ClassAnnotation, parameters: Parameters) -> Any:
+        """
+        Get the cache key of a parameterized build, or None when it may not be cached.
+        """
+        if abstract not in self.memoized or len(parameters) == 0 or self.get_contextual_concrete(abstract) is not None:
+            return None
+
+        if isinstance(parameters, dict):
+            key = (dict, frozenset(parameters.items()))
+        else:
+            key = (list, tuple(parameters))
+
+        try:
+            hash(key)
+        except TypeError:
+            self.memoized[abstract].skip()
+            return None
+
+        return key
+
+    def forget_memoized(self, abstract: ClassAnnotation, parameters: Parameters = None) -> None:
+        """
+        Drop the cached instance built with the given parameters, or every cached instance of the type.
+        """
+        abstract = self.get_alias(abstract)
+        if abstract not in self.memoized:
+            return
+
+        key = None if parameters is None else self.get_memo_key(abstract, parameters)
+        if key is not None:
+            self.memoized[abstract].forget(key)
+        elif parameters is None:
+            self.memoized[abstract].clear()
+
+    def get_memo_stats(self) -> Dict[ClassAnnotation, Dict[str, int]]:
+        return {abstract: memo.get_stats() for abstract, memo in self.memoized.items()}
+
     def extend(self, abstract: ClassAnnotation, closure: Callable) -> None:
         """
         "Extend" an abstract type in the container.
         """
+        self.assert_not_frozen()
         abstract = self.get_alias(abstract)
 
+        if abstract in self.memoized:
+            self.memoized[abstract].clear()
+
         if abstract in self.instances:
             self.instances[abstract] = closure(self.instances[abstract], self)
+            self.invalidate(abstract)
             self.rebound(abstract)
         else:
+            if abstract not in self.extenders:
+                self.extenders[abstract] = []
             self.extenders[abstract].append(closure)
+            self.extenderPipelines[abstract] = self.compose_extenders(self.extenders[abstract])
 
             if self.resolved(abstract):
+                self.invalidate(abstract)
                 self.rebound(abstract)
 
     def instance(self, abstract: ClassAnnotation, instance: Any) -> Any:
         """
         Register an existing instance as shared in the container.
         """
+        self.assert_not_frozen()
         self.remove_abstract_alias(abstract)
         is_bound = self.bound(abstract)
 
         self.aliases.pop(abstract, None)
 
         self.instances[abstract] = instance
+        self.forget_dependencies(abstract)
+        self.invalidate(abstract)
 
         if is_bound:
             self.rebound(abstract)
@@ -252,6 +461,8 @@ class Container(ContainerInterface):
         Bind a new callback to an abstract's rebind event.
         """
         abstract = self.get_alias(abstract)
+        if abstract not in self.reboundCallbacks:
+            self.reboundCallbacks[abstract] = []
         self.reboundCallbacks[abstract].append(callback)
 
         if self.bound(abstract):
@@ -271,11 +482,81 @@ class Container(ContainerInterface):
         """
         Fire the "rebound" callbacks for the given abstract type.
         """
+        if self.batchDepth > 0:
+            self.pendingRebounds[abstract] = True
+            return
+
         instance = self.make(abstract)
 
         for callback in self.get_rebound_callbacks(abstract):
             callback(self, instance)
 
+    @contextmanager
+    def batch(self) -> Iterator[ContainerInterface]:
+        """
+        Apply binding changes atomically, rebinding every affected type once on commit.
+
+        The container lock is held for the whole batch, so other threads
+        resolve either before it starts or once it is committed or rolled
+        back, and pooled types are never waited for inside it. Binding calls
+        do not take the lock: changes made by other threads during a batch are
+        not isolated from it, so make them on the thread running the batch.
+        A rolled back batch, nested or not, also drops the rebounds it deferred.
+        """
+        with self._lock:
+            snapshot = self.snapshot()
+            pending = dict(self.pendingRebounds)
+            self.batchDepth += 1
+            self.resolution.depth = self.get_resolution_depth() + 1
+
+            try:
+                try:
+                    yield self
+                except BaseException:
+                    self.batchDepth -= 1
+                    self.restore(snapshot)
+                    self.pendingRebounds = pending
+                    raise
+
+                self.batchDepth -= 1
+                if self.batchDepth == 0:
+                    self.commit_rebounds()
+            finally:
+                self.resolution.depth -= 1
+
+    def commit_rebounds(self) -> None:
+        """
+        Fire the rebounds deferred by a batch, dependencies first.
+        """
+        pending, self.pendingRebounds = self.pendingRebounds, {}
+
+        for abstract in self.sort_by_dependencies(list(pending)):
+            self.rebound(abstract)
+
+    def sort_by_dependencies(self, abstracts: List[ClassAnnotation]) -> List[ClassAnnotation]:
+        """
+        Order the given types so that each one follows the types it was built from.
+        """
+        wanted = set(abstracts)
+        visited = set()
+        ordered = []
+
+        def visit(abstract):
+            if abstract in visited:
+                return
+            visited.add(abstract)
+
+            for dependency in self.dependencies.get(abstract, ()):
+                visit(dependency)
+
+            if abstract in wanted:
+                ordered.append(abstract)
+
+        for abstract in abstracts:
+            visit(abstract)
+
+        return ordered
+
     def get_rebound_callbacks(self, abstract: ClassAnnotation) -> List[Callable[[ContainerInterface, Any], Any]]:
         """
         Get the rebound callbacks for a given type.
@@ -337,33 +618,162 @@ class Container(ContainerInterface):
 
         abstract = self.get_alias(abstract)
 
+        if not self.is_resolving():
+            if abstract in self.pools:
+                return self.resolve_pooled(abstract)
+
+            if len(parameters) == 0 and self.batchDepth == 0 and self.is_shared_instance(abstract):
+                try:
+                    return self.instances[abstract]
+                except KeyError:
+                    pass
+
+        with self._lock:
+            self.resolution.depth = self.get_resolution_depth() + 1
+            try:
+                return self._resolve(abstract, parameters)
+            finally:
+                self.resolution.depth -= 1
+
+    def is_shared_instance(self, abstract: ClassAnnotation) -> bool:
+        """
+        Determine if a resolved singleton can be handed out without taking the container lock.
+        """
+        return abstract in self.instances
+
+    def get_resolution_depth(self) -> int:
+        return getattr(self.resolution, 'depth', 0)
+
+    def is_resolving(self) -> bool:
+        """
+        Determine if the current thread holds the container lock for a resolve or a batch.
+        """
+        return self.get_resolution_depth() > 0
+
+    def _resolve(self, abstract: ClassAnnotation, parameters: Parameters) -> Any:
+        if len(self.dependencyStack) > 0:
+            self.dependencyStack[-1].add(abstract)
+
+        if abstract in self.pools and abstract not in self.poolBuilds:
+            return self.resolve_pooled(abstract, False)
+
         needs_contextual_build = len(parameters) > 0 or self.get_contextual_concrete(abstract) is not None
 
         if abstract in self.instances and not needs_contextual_build:
             return self.instances[abstract]
 
+        memo = self.get_memo_key(abstract, parameters)
+        if memo is not None:
+            found, obj = self.memoized[abstract].get(memo)
+            if found:
+                return obj
+
         self.withParameters.append(parameters)
+        self.dependencyStack.append(set())
 
-        concrete = self.get_concrete(abstract)
+        try:
+            concrete = self.get_concrete(abstract)
 
-        if self.is_buildable(concrete, abstract):
-            obj = self.build(concrete)
-        else:
-            obj = self.make(concrete)
+            if self.is_buildable(concrete, abstract):
+                obj = self.build(concrete)
+            else:
+                obj = self.make(concrete)
 
-        for extender in self.get_extenders(abstract):
-            obj = extender(obj, self)
+            pipeline = self.extenderPipelines.get(abstract)
+            if pipeline is not None:
+                obj = pipeline(obj, self)
 
-        if self.is_shared(abstract) and not needs_contextual_build:
-            self.instances[abstract] = obj
+            if self.is_shared(abstract) and not needs_contextual_build:
+                self.instances[abstract] = obj
+            elif memo is not None:
+                self.memoized[abstract].put(memo, obj)
 
-        self.fire_resolving_callbacks(abstract, obj)
-        self._resolved[abstract] = True
+            self.fire_resolving_callbacks(abstract, obj)
+            self._resolved[abstract] = True
+        finally:
+            self.withParameters.pop()
+            dependencies = self.dependencyStack.pop()
 
-        self.withParameters.pop()
+        self.record_dependencies(abstract, dependencies)
 
         return obj
 
+    def record_dependencies(self, abstract: ClassAnnotation, dependencies: Set[ClassAnnotation]) -> None:
+        """
+        Remember which types the given type was built from.
+        """
+        self.forget_dependencies(abstract)
+        dependencies.discard(abstract)
+
+        if len(dependencies) == 0:
+            return
+
+        self.dependencies[abstract] = dependencies
+        for dependency in dependencies:
+            if dependency not in self.dependents:
+                self.dependents[dependency] = set()
+            self.dependents[dependency].add(abstract)
+
+    def forget_dependencies(self, abstract: ClassAnnotation) -> None:
+        for dependency in self.dependencies.pop(abstract, ()):
+            if dependency in self.dependents:
+                self.dependents[dependency].discard(abstract)
+
+    def invalidate_dependents(self, abstract: ClassAnnotation, transitive: bool = True) -> List[ClassAnnotation]:
+        """
+        Drop the shared instances built from the given type, optionally following the whole chain.
+        """
+        abstract = self.get_alias(abstract)
+        pending = list(self.dependents.get(abstract, ()))
+        invalidated = []
+
+        while len(pending) > 0:
+            dependent = pending.pop()
+            if dependent == abstract or dependent in invalidated:
+                continue
+
+            invalidated.append(dependent)
+            self.instances.pop(dependent, None)
+            if dependent in self.memoized:
+                self.memoized[dependent].clear()
+
+            if transitive:
+                pending.extend(self.dependents.get(dependent, ()))
+
+            self.forget_dependencies(dependent)
+
+        return invalidated
+
+    @property
+    def invalidation(self) -> Optional[str]:
+        """
+        How a rebound type invalidates its dependents: not at all (None), only
+        the singletons built directly from it ('direct'), or every singleton
+        built from it, however indirectly ('transitive').
+        """
+        return self.invalidationMode
+
+    @invalidation.setter
+    def invalidation(self, mode: Optional[str]) -> None:
+        if mode not in (None, 'direct', 'transitive'):
+            raise ValueError("Unknown invalidation mode [{0}]".format(mode))
+
+        self.invalidationMode = mode
+
+    def invalidate(self, abstract: ClassAnnotation) -> None:
+        """
+        Invalidate the dependents of a rebound type according to the configured invalidation mode.
+        """
+        if abstract in self.memoized:
+            self.memoized[abstract].clear()
+
+        if self.invalidation is None:
+            return
+
+        for dependent in self.invalidate_dependents(abstract, self.invalidation == 'transitive'):
+            if dependent in self.reboundCallbacks:
+                self.rebound(dependent)
+
     def get_concrete(self, abstract: ClassAnnotation) -> Any:
         """
         Get the concrete type for a given abstract.
@@ -423,7 +833,7 @@ class Container(ContainerInterface):
     def resolve_dependencies(self, dependencies: Signature):
         results = []
         for key, dependency in dependencies.parameters.items():
-            if key == 'self':
+            if key == 'self' or dependency.kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
                 continue
             if self.has_parameter_override(dependency):
                 results.append(self.get_parameter_override(dependency))
@@ -542,8 +952,27 @@ class Container(ContainerInterface):
 
         return []
 
+    def compose_extenders(self, extenders: List[Callable[[Any, ContainerInterface], Any]]) -> Callable[[Any, ContainerInterface], Any]:
+        """
+        Fold the extenders of a type into a single decorator, applied in registration order.
+        """
+        if len(extenders) == 1:
+            return extenders[0]
+
+        chain = tuple(extenders)
+
+        def pipeline(obj, app):
+            for extender in chain:
+                obj = extender(obj, app)
+            return obj
+
+        return pipeline
+
     def forget_extenders(self, abstract: ClassAnnotation) -> None:
+        self.assert_not_frozen()
+        abstract = self.get_alias(abstract)
         self.extenders.pop(abstract, None)
+        self.extenderPipelines.pop(abstract, None)
 
     def drop_stale_instances(self, abstract: ClassAnnotation) -> None:
         self.instances.pop(abstract, None)
@@ -556,11 +985,149 @@ class Container(ContainerInterface):
         self.instances = {}
 
     def flush(self) -> None:
+        self.assert_not_frozen()
         self.aliases = {}
         self._resolved = {}
         self.bindings = {}
         self.instances = {}
         self.abstractAliases = {}
+        self.dependencies = {}
+        self.dependents = {}
+        self.pools = {}
+        self.memoized = {}
+
+    def get_frozen_attributes(self) -> List[str]:
+        return [
+            'bindings',
+            'methodBindings',
+            'aliases',
+            'abstractAliases',
+            'extenders',
+            'extenderPipelines',
+            'tags',
+            'reboundCallbacks',
+            'resolvingCallbacks',
+            'afterResolvingCallbacks',
+            'contextual',
+        ]
+
+    def freeze(self) -> None:
+        """
+        Make the binding tables immutable and move the built objects out of reach of the garbage collector.
+        """
+        with self._lock:
+            for name in self.get_frozen_attributes():
+                setattr(self, name, freeze_table(getattr(self, name)))
+
+            self.frozen = True
+
+        if not self.gcFrozen:
+            self.gcFrozen = freeze_gc()
+
+    def thaw(self) -> None:
+        """
+        Make the binding tables of a frozen container writable again.
+
+        The garbage collector's permanent generation is only unfrozen once
+        every container which froze it has been thawed.
+        """
+        with self._lock:
+            for name in self.get_frozen_attributes():
+                setattr(self, name, thaw_table(getattr(self, name)))
+
+            self.frozen = False
+
+        if self.gcFrozen:
+            self.gcFrozen = False
+            unfreeze_gc()
+
+    def is_frozen(self) -> bool:
+        return self.frozen
+
+    def assert_not_frozen(self) -> None:
+        if self.frozen:
+            raise FrozenContainerException("Cannot modify the bindings of a frozen container")
+
+    def after_fork(self, callback: Callable[[ContainerInterface], Any]) -> None:
+        """
+        Register a callback to reset per-process state in forked children.
+        """
+        self.forkCallbacks.append(callback)
+
+    def fork_scoped(self, abstract: ClassAnnotation) -> None:
+        """
+        Rebuild the shared instance of the given type in every forked child.
+        """
+        self.forkScoped.append(self.get_alias(abstract))
+
+    def reinitialize_after_fork(self) -> None:
+        self._lock = threading.RLock()
+
+        for abstract in self.forkScoped:
+            self.instances.pop(abstract, None)
+
+        for pool in self.pools.values():
+            pool.reinitialize_after_fork()
+        self.poolScopes = threading.local()
+        self.resolution = threading.local()
+
+        for callback in self.forkCallbacks:
+            call_user_func(callback, self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the binding graph and shared instances so they can be restored later.
+        """
+        with self._lock:
+            return {name: self.copy_state(getattr(self, name)) for name in self.get_snapshot_attributes()}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Bring the container back to a snapshot, dropping everything resolved since.
+        """
+        self.assert_not_frozen()
+
+        with self._lock:
+            for name, value in snapshot.items():
+                setattr(self, name, self.copy_state(value))
+
+            self.buildStack = []
+            self.withParameters = []
+
+    def get_snapshot_attributes(self) -> List[str]:
+        return [
+            '_resolved',
+            'bindings',
+            'methodBindings',
+            'instances',
+            'aliases',
+            'abstractAliases',
+            'extenders',
+            'extenderPipelines',
+            'tags',
+            'reboundCallbacks',
+            'globalResolvingCallbacks',
+            'globalAfterResolvingCallbacks',
+            'resolvingCallbacks',
+            'afterResolvingCallbacks',
+            'contextual',
+            'dependencies',
+            'dependents',
+            'pools',
+            'memoized',
+        ]
+
+    def copy_state(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: self.copy_state_entry(entry) for key, entry in value.items()}
+
+        return self.copy_state_entry(value)
+
+    def copy_state_entry(self, value: Any) -> Any:
+        if isinstance(value, (dict, list, set)):
+            return type(value)(value)
+
+        return value
 
     def __getitem__(self, key):
         return self.make(key)
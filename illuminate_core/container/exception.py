@@ -4,3 +4,11 @@ class BindingResolutionException(RuntimeError):
 
 class EntryNotFoundException(RuntimeError):
     pass
+
+
+class FrozenContainerException(RuntimeError):
+    pass
+
+
+class PoolExhaustedException(RuntimeError):
+    pass
@@ -0,0 +1,91 @@
+import gc
+import threading
+from typing import Any
+from .exception import FrozenContainerException
+
+
+class FrozenDict(dict):
+    """
+    A binding table which rejects every modification once the container is frozen.
+    """
+    def _frozen(self, *args, **kwargs) -> Any:
+        raise FrozenContainerException("Cannot modify the bindings of a frozen container")
+
+    __setitem__ = _frozen
+    __delitem__ = _frozen
+    clear = _frozen
+    pop = _frozen
+    popitem = _frozen
+    setdefault = _frozen
+    update = _frozen
+
+
+class FrozenList(tuple):
+    """
+    A list of a frozen container, turned into a tuple so that thawing knows to turn it back.
+    """
+
+
+def freeze_value(value: Any) -> Any:
+    """
+    Freeze the plain dicts and lists of a binding table, however deeply nested.
+    """
+    if type(value) is dict:
+        return freeze_table(value)
+    if type(value) is list:
+        return FrozenList(freeze_value(item) for item in value)
+
+    return value
+
+
+def thaw_value(value: Any) -> Any:
+    """
+    Undo the conversions made by freeze_value, leaving every other value as it is.
+    """
+    if type(value) is FrozenDict:
+        return thaw_table(value)
+    if type(value) is FrozenList:
+        return [thaw_value(item) for item in value]
+
+    return value
+
+
+def freeze_table(table: dict) -> FrozenDict:
+    return FrozenDict((key, freeze_value(value)) for key, value in table.items())
+
+
+def thaw_table(table: dict) -> dict:
+    return {key: thaw_value(value) for key, value in table.items()}
+
+
+_gc_lock = threading.Lock()
+_gc_freezes = 0
+
+
+def freeze_gc() -> bool:
+    """
+    Move every tracked object to the permanent generation, returning whether the interpreter supports it.
+    """
+    global _gc_freezes
+
+    if not hasattr(gc, 'freeze'):
+        return False
+
+    with _gc_lock:
+        gc.collect()
+        gc.freeze()
+        _gc_freezes += 1
+
+    return True
+
+
+def unfreeze_gc() -> None:
+    """
+    Release one freeze_gc() call, unfreezing the permanent generation once none is left.
+    """
+    global _gc_freezes
+
+    with _gc_lock:
+        _gc_freezes -= 1
+        if _gc_freezes == 0:
+            gc.unfreeze()
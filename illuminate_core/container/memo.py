@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class MemoCache:
+    """
+    A least recently used cache of the instances built for a type, keyed by their override parameters.
+
+    Entries older than ttl seconds are treated as missing and dropped when
+    looked up; the least recently used entry is evicted once the cache holds
+    max_size entries.
+    """
+    maxSize: int
+    ttl: Optional[float]
+    entries: 'OrderedDict[Hashable, Tuple[Any, Optional[float]]]'
+
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.maxSize = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[Hashable, Tuple[Any, Optional[float]]]' = OrderedDict()
+        self.counters: Dict[str, int] = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'uncacheable': 0}
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look an entry up, returning whether it was found along with its value.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+                del self.entries[key]
+                self.counters['expired'] += 1
+                entry = None
+
+            if entry is None:
+                self.counters['misses'] += 1
+                return False, None
+
+            self.entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return True, entry[0]
+
+    def empty_copy(self) -> 'MemoCache':
+        """
+        Make an empty cache with the same size, TTL and clock.
+        """
+        return MemoCache(self.maxSize, self.ttl, self.clock)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = None if self.ttl is None else self.clock() + self.ttl
+
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+                self.counters['evicted'] += 1
+
+    def skip(self) -> None:
+        with self.lock:
+            self.counters['uncacheable'] += 1
+
+    def forget(self, key: Hashable) -> bool:
+        with self.lock:
+            return self.entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters, size=len(self.entries), max_size=self.maxSize)
@@ -0,0 +1,376 @@
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Set
+
+from .container import Container
+from .types import ClassAnnotation, Parameters
+
+
+class OverlayTable(MutableMapping):
+    """
+    A table reading through to a shared table and writing into its own.
+
+    Removing a shared key only hides it from this table.
+    """
+    own: Dict[Any, Any]
+    shared: Dict[Any, Any]
+    hidden: Set[Any]
+
+    def __init__(self, shared: Dict[Any, Any]):
+        self.own: Dict[Any, Any] = {}
+        self.shared = shared
+        self.hidden: Set[Any] = set()
+
+    def __getitem__(self, key):
+        if key in self.own:
+            return self.own[key]
+        if key in self.hidden:
+            raise KeyError(key)
+        return self.shared[key]
+
+    def __contains__(self, key):
+        return key in self.own or (key not in self.hidden and key in self.shared)
+
+    def __setitem__(self, key, value):
+        self.own[key] = value
+        self.hidden.discard(key)
+
+    def __delitem__(self, key):
+        found = self.own.pop(key, self) is not self
+        if key in self.shared and key not in self.hidden:
+            self.hidden.add(key)
+            found = True
+
+        if not found:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        for key in self.shared:
+            if key not in self.own and key not in self.hidden:
+                yield key
+        yield from self.own
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self, copy_entry: Callable[[Any], Any] = lambda entry: entry) -> 'OverlayTable':
+        """
+        Copy the table's own entries and hidden keys, still reading through to the same shared table.
+        """
+        table = OverlayTable(self.shared)
+        table.own = {key: copy_entry(entry) for key, entry in self.own.items()}
+        table.hidden = set(self.hidden)
+        return table
+
+
+class ContainerOverlay(Container):
+    """
+    A container layered over a base container.
+
+    Every binding table reads through to the base and writes into the
+    overlay only, so an overlay costs no more than its own overrides and the
+    instances it built. Singletons already resolved by the base are shared
+    unless they were built, even indirectly, from a type the overlay
+    overrides; those are rebuilt in the overlay, as are the singletons first
+    resolved through it. The pools of the base are shared as they are.
+    """
+    base: Container
+    tenant: Hashable
+    disposingCallbacks: List[Callable[['ContainerOverlay'], Any]]
+    overrides: Set[ClassAnnotation]
+    checked: Set[ClassAnnotation]
+
+    def __init__(self, base: Container, tenant: Hashable = None):
+        super().__init__()
+        self.base = base
+        self.tenant = tenant
+        self.disposingCallbacks: List[Callable[['ContainerOverlay'], Any]] = []
+        self.overrides: Set[ClassAnnotation] = set()
+        self.checked: Set[ClassAnnotation] = set()
+        self.mount()
+
+    def get_overlay_attributes(self) -> List[str]:
+        return [
+            'bindings',
+            'methodBindings',
+            'instances',
+            'aliases',
+            'abstractAliases',
+            'extenders',
+            'extenderPipelines',
+            'tags',
+            'reboundCallbacks',
+            'resolvingCallbacks',
+            'afterResolvingCallbacks',
+            'contextual',
+            'pools',
+        ]
+
+    def mount(self) -> None:
+        for name in self.get_overlay_attributes():
+            setattr(self, name, OverlayTable(getattr(self.base, name)))
+
+        self.globalResolvingCallbacks = list(self.base.globalResolvingCallbacks)
+        self.globalAfterResolvingCallbacks = list(self.base.globalAfterResolvingCallbacks)
+        self.overrides = set()
+        self.checked = set()
+
+    def copy_on_write(self, table: OverlayTable, key: Any) -> None:
+        """
+        Copy a shared list or dict entry into the overlay before it is modified in place.
+        """
+        if key in table and key not in table.own:
+            table[key] = type(table[key])(table[key])
+
+    def override(self, abstract: ClassAnnotation) -> None:
+        """
+        Remember a type the overlay replaces, so the base singletons built from it are not shared.
+        """
+        self.overrides.add(abstract)
+        self.checked = set()
+
+    def depends_on_overrides(self, abstract: ClassAnnotation) -> bool:
+        """
+        Determine if the base built the given type from anything the overlay overrides.
+        """
+        pending = list(self.base.dependencies.get(abstract, ()))
+        visited = set()
+
+        while len(pending) > 0:
+            dependency = pending.pop()
+            if dependency in self.overrides:
+                return True
+            if dependency not in visited:
+                visited.add(dependency)
+                pending.extend(self.base.dependencies.get(dependency, ()))
+
+        return False
+
+    def bind(self, abstract: ClassAnnotation, concrete=None, shared: bool = False):
+        if abstract in self.pools and abstract not in self.pools.own:
+            self.pools.hidden.add(abstract)
+
+        self.override(abstract)
+        super().bind(abstract, concrete, shared)
+
+    def instance(self, abstract: ClassAnnotation, instance: Any) -> Any:
+        self.override(abstract)
+        return super().instance(abstract, instance)
+
+    def extend(self, abstract: ClassAnnotation, closure: Callable) -> None:
+        abstract = self.get_alias(abstract)
+        self.copy_on_write(self.extenders, abstract)
+        self.override(abstract)
+
+        if abstract in self.instances and abstract not in self.instances.own:
+            self.instances.hidden.add(abstract)
+
+        super().extend(abstract, closure)
+
+    def rebinding(self, abstract: ClassAnnotation, callback: Callable):
+        self.copy_on_write(self.reboundCallbacks, self.get_alias(abstract))
+        super().rebinding(abstract, callback)
+
+    def tag(self, abstracts, *tags):
+        for tag in tags:
+            self.copy_on_write(self.tags, tag)
+        super().tag(abstracts, *tags)
+
+    def alias(self, abstract: ClassAnnotation, alias: ClassAnnotation):
+        self.copy_on_write(self.abstractAliases, abstract)
+        super().alias(abstract, alias)
+
+    def remove_abstract_alias(self, searched: ClassAnnotation) -> None:
+        if searched in self.aliases:
+            for abstract, aliases in list(self.abstractAliases.items()):
+                if searched in aliases:
+                    self.copy_on_write(self.abstractAliases, abstract)
+        super().remove_abstract_alias(searched)
+
+    def resolving(self, *, abstract: ClassAnnotation = None, callback: Callable):
+        self.copy_on_write(self.resolvingCallbacks, abstract if abstract is None else self.get_alias(abstract))
+        super().resolving(abstract=abstract, callback=callback)
+
+    def after_resolving(self, *, abstract: str = '', callback: Callable):
+        self.copy_on_write(self.afterResolvingCallbacks, abstract if abstract == '' else self.get_alias(abstract))
+        super().after_resolving(abstract=abstract, callback=callback)
+
+    def add_contextual_binding(self, concrete, abstract, implementation) -> None:
+        self.copy_on_write(self.contextual, concrete)
+        super().add_contextual_binding(concrete, abstract, implementation)
+
+    def bound(self, abstract: ClassAnnotation) -> bool:
+        return super().bound(abstract) or self.base.bound(abstract)
+
+    def make(self, abstract: ClassAnnotation, parameters: Parameters = None) -> Any:
+        abstract = self.get_alias(abstract)
+
+        if not super().bound(abstract) and self.base.bound(abstract):
+            self.base.make(abstract)
+
+        return super().make(abstract, parameters)
+
+    def get_memo_key(self, abstract: ClassAnnotation, parameters: Parameters) -> Any:
+        if abstract not in self.memoized and abstract in self.base.memoized:
+            self.memoized[abstract] = self.base.memoized[abstract].empty_copy()
+
+        return super().get_memo_key(abstract, parameters)
+
+    def is_shared_instance(self, abstract: ClassAnnotation) -> bool:
+        return abstract in self.instances.own or (abstract in self.checked and abstract in self.instances)
+
+    def _resolve(self, abstract: ClassAnnotation, parameters: Parameters) -> Any:
+        if abstract not in self.checked and abstract not in self.instances.own and abstract in self.instances:
+            self.checked.add(abstract)
+            if self.depends_on_overrides(abstract):
+                self.instances.hidden.add(abstract)
+
+        return super()._resolve(abstract, parameters)
+
+    def flush(self) -> None:
+        super().flush()
+        self.mount()
+
+    def forget_instances(self) -> None:
+        self.instances = OverlayTable(self.base.instances)
+        self.checked = set()
+
+    def get_snapshot_attributes(self) -> List[str]:
+        return super().get_snapshot_attributes() + ['overrides', 'checked']
+
+    def copy_state(self, value: Any) -> Any:
+        if isinstance(value, OverlayTable):
+            return value.copy(self.copy_state_entry)
+
+        return super().copy_state(value)
+
+    def get_tenant_instances(self) -> Dict[ClassAnnotation, Any]:
+        return self.instances.own
+
+    def get_footprint(self) -> int:
+        """
+        Estimate the bytes held by the overlay itself, counting its tables and the instances it owns.
+        """
+        size = sum(sys.getsizeof(getattr(self, name).own) for name in self.get_overlay_attributes())
+
+        return size + sum(sys.getsizeof(instance) for instance in self.get_tenant_instances().values())
+
+    def disposing(self, callback: Callable[['ContainerOverlay'], Any]) -> None:
+        """
+        Register a callback to release the overlay's resources when it is disposed of.
+        """
+        self.disposingCallbacks.append(callback)
+
+    def dispose(self) -> None:
+        for callback in self.disposingCallbacks:
+            callback(self)
+
+        for pool in self.pools.own.values():
+            pool.clear()
+
+        self.disposingCallbacks = []
+        self.memoized = {}
+        self.mount()
+
+
+class TenantOverlays:
+    """
+    The overlays of a base container kept in a least recently used cache by tenant.
+
+    A missing tenant gets a fresh overlay handed to configure, which binds its
+    overrides. Once more than max_tenants overlays are cached, or their
+    estimated footprint exceeds max_memory bytes, the least recently used
+    ones are disposed of.
+    """
+    base: Container
+    maxTenants: Optional[int]
+    maxMemory: Optional[int]
+    overlays: 'OrderedDict[Hashable, ContainerOverlay]'
+
+    def __init__(
+            self,
+            base: Container,
+            configure: Optional[Callable[[ContainerOverlay], Any]] = None,
+            max_tenants: Optional[int] = 1024,
+            max_memory: Optional[int] = None
+    ):
+        self.base = base
+        self.configure = configure
+        self.maxTenants = max_tenants
+        self.maxMemory = max_memory
+        self.lock = threading.RLock()
+        self.overlays: 'OrderedDict[Hashable, ContainerOverlay]' = OrderedDict()
+        self.footprints: Dict[Hashable, int] = {}
+        self.footprint = 0
+        self.counters: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, tenant: Hashable) -> ContainerOverlay:
+        """
+        Get the overlay of a tenant, creating it when it is missing.
+        """
+        with self.lock:
+            overlay = self.overlays.get(tenant)
+
+            if overlay is not None:
+                self.counters['hits'] += 1
+                self.overlays.move_to_end(tenant)
+            else:
+                self.counters['misses'] += 1
+                overlay = ContainerOverlay(self.base, tenant)
+                if self.configure is not None:
+                    self.configure(overlay)
+                self.overlays[tenant] = overlay
+
+            if self.maxMemory is not None:
+                self.measure(tenant)
+
+            self.evict(tenant)
+
+            return overlay
+
+    def measure(self, tenant: Hashable) -> None:
+        footprint = self.overlays[tenant].get_footprint()
+        self.footprint += footprint - self.footprints.get(tenant, 0)
+        self.footprints[tenant] = footprint
+
+    def evict(self, keep: Hashable) -> None:
+        while len(self.overlays) > 1 and (
+            (self.maxTenants is not None and len(self.overlays) > self.maxTenants) or
+            (self.maxMemory is not None and self.footprint > self.maxMemory)
+        ):
+            tenant = next(iter(self.overlays))
+            if tenant == keep:
+                return
+
+            self.forget(tenant)
+            self.counters['evictions'] += 1
+
+    def forget(self, tenant: Hashable) -> None:
+        """
+        Dispose of the overlay of a tenant.
+        """
+        with self.lock:
+            overlay = self.overlays.pop(tenant, None)
+            self.footprint -= self.footprints.pop(tenant, 0)
+
+        if overlay is not None:
+            overlay.dispose()
+
+    def clear(self) -> None:
+        for tenant in list(self.overlays):
+            self.forget(tenant)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters, tenants=len(self.overlays), footprint=self.footprint)
+
+    def __getitem__(self, tenant: Hashable) -> ContainerOverlay:
+        return self.get(tenant)
+
+    def __contains__(self, tenant: Hashable) -> bool:
+        return tenant in self.overlays
+
+    def __len__(self):
+        return len(self.overlays)
@@ -0,0 +1,156 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .exception import PoolExhaustedException
+
+
+class ObjectPool:
+    """
+    A bounded pool of reusable instances.
+
+    Idle instances are handed out last-in first-out so the warmest one is
+    reused. validate is checked before an idle instance is handed out and
+    reset when it comes back; an instance failing either is disposed of and
+    replaced. When every instance is in use, acquire() waits up to timeout
+    seconds for one to come back, or fails at once when block is off.
+    """
+    maxSize: int
+    block: bool
+    timeout: Optional[float]
+    idle: List[Any]
+    size: int = 0
+
+    def __init__(
+            self,
+            factory: Callable[[], Any],
+            max_size: int = 8,
+            validate: Optional[Callable[[Any], bool]] = None,
+            reset: Optional[Callable[[Any], Any]] = None,
+            dispose: Optional[Callable[[Any], Any]] = None,
+            block: bool = True,
+            timeout: Optional[float] = None
+    ):
+        if max_size < 1:
+            raise ValueError("A pool needs room for at least one instance")
+
+        self.factory = factory
+        self.maxSize = max_size
+        self.validate = validate
+        self.reset = reset
+        self.dispose = dispose
+        self.block = block
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.idle: List[Any] = []
+        self.size = 0
+        self.counters: Dict[str, int] = {'created': 0, 'reused': 0, 'discarded': 0, 'waits': 0, 'exhausted': 0}
+
+    def acquire(self, block: Optional[bool] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Take an instance out of the pool, creating one while the pool has room.
+        """
+        block = self.block if block is None else block
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self.condition:
+                while len(self.idle) == 0 and self.size >= self.maxSize:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if not block or (remaining is not None and remaining <= 0):
+                        self.counters['exhausted'] += 1
+                        raise PoolExhaustedException("All {0} pooled instances are in use".format(self.maxSize))
+
+                    self.counters['waits'] += 1
+                    self.condition.wait(remaining)
+
+                if len(self.idle) == 0:
+                    self.size += 1
+                    self.counters['created'] += 1
+                    break
+
+                instance = self.idle.pop()
+
+            if self.validate is None or self.validate(instance):
+                with self.condition:
+                    self.counters['reused'] += 1
+                return instance
+
+            self.discard(instance)
+
+        try:
+            return self.factory()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.counters['created'] -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, instance: Any) -> None:
+        """
+        Give an instance back to the pool.
+        """
+        if self.reset is not None:
+            try:
+                self.reset(instance)
+            except Exception:
+                self.discard(instance)
+                raise
+
+        with self.condition:
+            self.idle.append(instance)
+            self.condition.notify()
+
+    def discard(self, instance: Any) -> None:
+        """
+        Drop an instance for good, making room for a new one.
+        """
+        with self.condition:
+            self.size -= 1
+            self.counters['discarded'] += 1
+            self.condition.notify()
+
+        if self.dispose is not None:
+            self.dispose(instance)
+
+    @contextmanager
+    def borrow(self, block: Optional[bool] = None, timeout: Optional[float] = None) -> Iterator[Any]:
+        instance = self.acquire(block, timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def clear(self) -> None:
+        """
+        Dispose of every idle instance.
+        """
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            self.condition.notify_all()
+
+        if self.dispose is not None:
+            for instance in idle:
+                self.dispose(instance)
+
+    def reinitialize_after_fork(self) -> None:
+        """
+        Forget the instances inherited from the parent process without disposing of them.
+        """
+        self.condition = threading.Condition()
+        self.idle = []
+        self.size = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.condition:
+            return dict(
+                self.counters,
+                max_size=self.maxSize,
+                size=self.size,
+                idle=len(self.idle),
+                in_use=self.size - len(self.idle),
+            )
@@ -105,3 +105,487 @@ def test_class_inject():
     assert isinstance(c.make(B), B)
     assert isinstance(c[B], B)
     assert isinstance(c.make(B).a, A)
+
+
+def test_snapshot_restore():
+    c = Container()
+
+    class A:
+        def __init__(self):
+            pass
+
+    c.singleton(A)
+    a = c.make(A)
+    snapshot = c.snapshot()
+
+    c.singleton('b', lambda: 'b')
+    c.make('b')
+    c.instance(A, None)
+    c.restore(snapshot)
+
+    assert c.make(A) is a
+    assert not c.bound('b')
+
+
+def test_freeze():
+    from .exception import FrozenContainerException
+
+    c = Container()
+    c.singleton('a', lambda: object())
+    c.freeze()
+
+    a = c.make('a')
+    assert c.make('a') is a
+
+    try:
+        c.bind('b', lambda: 1)
+        assert False
+    except FrozenContainerException:
+        pass
+
+    c.thaw()
+    c.bind('b', lambda: 1)
+    assert c.make('b') == 1
+
+
+def test_freeze_is_deep_and_thaw_undoes_only_its_own_conversions():
+    import gc
+    from .exception import FrozenContainerException
+
+    c = Container()
+    c.bind('a', lambda: 1)
+    c.tag(['a'], 'numbers')
+    c.add_contextual_binding('a', 'config', lambda: {'debug': True})
+    c.tags['pairs'] = [(1, 2)]
+    c.freeze()
+
+    try:
+        c.contextual['a']['config'] = None
+        assert False
+    except FrozenContainerException:
+        pass
+    assert c.tags['numbers'] == ('a',)
+
+    other = Container()
+    other.freeze()
+    c.thaw()
+    assert c.tags['numbers'] == ['a']
+    assert c.tags['pairs'] == [(1, 2)]
+    assert type(c.contextual['a']) is dict
+    if hasattr(gc, 'get_freeze_count'):
+        assert gc.get_freeze_count() > 0
+
+    other.thaw()
+    if hasattr(gc, 'get_freeze_count'):
+        assert gc.get_freeze_count() == 0
+
+
+def test_after_fork_resets_fork_scoped_instances():
+    c = Container()
+    reset = []
+    c.singleton('pool', lambda: object())
+    pool = c.make('pool')
+    c.fork_scoped('pool')
+    c.after_fork(lambda app: reset.append(app))
+
+    c.reinitialize_after_fork()
+
+    assert reset == [c]
+    assert c.make('pool') is not pool
+
+
+def test_rebinding_invalidates_dependent_singletons():
+    c = Container()
+    c.invalidation = 'transitive'
+    c.instance('config', {'dsn': 'old'})
+    c.singleton('db', lambda app: app.make('config')['dsn'])
+    c.singleton('repository', lambda app: 'repository:' + app.make('db'))
+    c.singleton('clock', lambda: object())
+    clock = c.make('clock')
+
+    assert c.make('repository') == 'repository:old'
+
+    c.instance('config', {'dsn': 'new'})
+
+    assert c.make('repository') == 'repository:new'
+    assert c.make('clock') is clock
+
+
+def test_direct_invalidation_keeps_indirect_dependents():
+    c = Container()
+    c.invalidation = 'direct'
+    c.instance('config', 'old')
+    c.singleton('db', lambda app: app.make('config'))
+    c.singleton('repository', lambda app: app.make('db'))
+    c.make('repository')
+
+    c.instance('config', 'new')
+
+    assert c.make('db') == 'new'
+    assert c.make('repository') == 'old'
+
+
+def test_invalidation_mode_is_validated():
+    c = Container()
+
+    try:
+        c.invalidation = 'transitve'
+        assert False
+    except ValueError:
+        pass
+
+    assert c.invalidation is None
+
+
+def test_batch_defers_rebound_until_commit():
+    c = Container()
+    c.bind('a', lambda: 1)
+    c.bind('b', lambda app: app.make('a') + 1)
+    c.make('b')
+    rebound = []
+    c.rebinding('a', lambda app, instance: rebound.append(('a', instance)))
+    c.rebinding('b', lambda app, instance: rebound.append(('b', instance)))
+    rebound.clear()
+
+    with c.batch():
+        c.bind('b', lambda app: app.make('a') + 10)
+        c.bind('a', lambda: 2)
+        c.bind('a', lambda: 3)
+        assert rebound == []
+
+    assert rebound == [('a', 3), ('b', 13)]
+
+
+def test_batch_rolls_back_on_error():
+    c = Container()
+    c.bind('a', lambda: 1)
+
+    try:
+        with c.batch():
+            c.bind('a', lambda: 2)
+            c.bind('b', lambda: 2)
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert c.make('a') == 1
+    assert not c.bound('b')
+
+
+def test_rolled_back_nested_batch_drops_its_rebounds():
+    c = Container()
+    c.bind('a', lambda: 1)
+    c.bind('b', lambda: 1)
+    rebound = []
+    c.rebinding('a', lambda app, instance: rebound.append(('a', instance)))
+    c.rebinding('b', lambda app, instance: rebound.append(('b', instance)))
+
+    with c.batch():
+        c.bind('a', lambda: 2)
+        try:
+            with c.batch():
+                c.bind('b', lambda: 2)
+                raise ValueError()
+        except ValueError:
+            pass
+
+    assert rebound == [('a', 2)]
+    assert c.make('b') == 1
+
+
+def test_batch_holds_the_container_lock():
+    import threading
+
+    c = Container()
+    c.singleton('a', lambda: 1)
+    c.make('a')
+    seen = []
+
+    with c.batch():
+        c.instance('a', 2)
+        reader = threading.Thread(target=lambda: seen.append(c.make('a')))
+        reader.start()
+        reader.join(0.05)
+        assert seen == []
+
+    reader.join(5)
+    assert seen == [2]
+
+
+def test_pooled_instances_are_reused():
+    from .exception import BindingResolutionException, PoolExhaustedException
+
+    class Parser:
+        broken = False
+
+    c = Container()
+    reset = []
+    pool = c.pooled(Parser, max_size=2, block=False, validate=lambda parser: not parser.broken, reset=reset.append)
+
+    with c.borrow(Parser) as first:
+        with c.borrow(Parser) as second:
+            assert first is not second
+            try:
+                pool.acquire()
+                assert False
+            except PoolExhaustedException:
+                pass
+
+    with c.pool_scope():
+        assert c.make(Parser) is c.make(Parser) is first
+    assert reset == [second, first, first]
+
+    first.broken = True
+    with c.borrow(Parser) as parser:
+        assert parser is second
+
+    try:
+        c.make(Parser)
+        assert False
+    except BindingResolutionException:
+        pass
+
+    stats = c.get_pool_stats()[Parser]
+    assert stats['created'] == 2 and stats['discarded'] == 1 and stats['exhausted'] == 1 and stats['in_use'] == 0
+
+
+def test_memoized_parameterized_builds():
+    class Client:
+        def __init__(self, region):
+            self.region = region
+
+    now = [0.0]
+    c = Container()
+    c.bind(Client)
+    memo = c.memoize(Client, max_size=2, ttl=10, clock=lambda: now[0])
+
+    eu = c.make_with(Client, {'region': 'eu'})
+    assert c.make_with(Client, {'region': 'eu'}) is eu
+    assert c.make_with(Client, {'region': 'us'}) is not eu
+
+    c.forget_memoized(Client, {'region': 'eu'})
+    assert c.make_with(Client, {'region': 'eu'}) is not eu
+
+    eu = c.make_with(Client, {'region': 'eu'})
+    now[0] = 11
+    assert c.make_with(Client, {'region': 'eu'}) is not eu
+
+    c.make_with(Client, {'region': 'us'})
+    c.make_with(Client, {'region': 'ap'})
+    assert len(memo) == 2
+
+    stats = c.get_memo_stats()[Client]
+    assert stats['hits'] == 2 and stats['expired'] == 2 and stats['evicted'] == 1
+
+
+def test_memoized_builds_are_dropped_when_extended_or_replaced():
+    class Client:
+        def __init__(self, region='eu'):
+            self.region = region
+
+    c = Container()
+    c.bind(Client)
+    c.memoize(Client)
+
+    client = c.make_with(Client, {'region': 'us'})
+    c.extend(Client, lambda client, app: ('wrapped', client))
+    wrapped = c.make_with(Client, {'region': 'us'})
+    assert wrapped[0] == 'wrapped' and wrapped[1] is not client
+
+    c.instance(Client, Client('ap'))
+    assert c.make_with(Client, {'region': 'us'}) is not wrapped
+
+
+def test_extenders_are_composed_in_order():
+    c = Container()
+    c.bind('greeting', lambda: 'hello')
+    c.extend('greeting', lambda greeting, app: greeting + ' world')
+    c.extend('greeting', lambda greeting, app: greeting.upper())
+    assert c.make('greeting') == 'HELLO WORLD'
+    assert len(c.get_extenders('greeting')) == 2
+
+    c.forget_extenders('greeting')
+    assert c.make('greeting') == 'hello'
+
+    for _ in range(2000):
+        c.extend('greeting', lambda greeting, app: greeting)
+    assert c.make('greeting') == 'hello'
+
+
+def test_tenant_overlays_share_the_base():
+    from .overlay import TenantOverlays
+
+    class Repository:
+        def __init__(self, shard):
+            self.shard = shard
+
+    base = Container()
+    base.instance('shard', 'default')
+    base.singleton('config', lambda: {'debug': False})
+    base.bind(Repository, lambda app: Repository(app.make('shard')))
+    config = base.make('config')
+
+    disposed = []
+
+    def configure(overlay):
+        overlay.instance('shard', 'shard-{0}'.format(overlay.tenant))
+        overlay.disposing(lambda overlay: disposed.append(overlay.tenant))
+
+    tenants = TenantOverlays(base, configure, max_tenants=2)
+
+    assert tenants['a'].make('config') is config
+    assert tenants['a'].make(Repository).shard == 'shard-a'
+    assert tenants['b'].make(Repository).shard == 'shard-b'
+    assert base.make(Repository).shard == 'default'
+    assert list(tenants['a'].get_tenant_instances()) == ['shard']
+
+    tenants['c']
+    assert disposed == ['b'] and 'b' not in tenants
+    assert tenants.get_stats()['hits'] == 2 and tenants.get_stats()['evictions'] == 1
+
+
+def test_tenant_overlays_rebuild_base_singletons_built_from_overrides():
+    from .overlay import ContainerOverlay
+
+    base = Container()
+    base.instance('credentials', 'default-creds')
+    base.singleton('db', lambda app: 'conn({0})'.format(app.make('credentials')))
+    base.singleton('repository', lambda app: 'repo[{0}]'.format(app.make('db')))
+    base.singleton('clock', lambda: object())
+    base.pooled('parser', lambda: object(), max_size=1)
+    base.make('repository')
+    clock = base.make('clock')
+
+    overlay = ContainerOverlay(base, 'a')
+    overlay.instance('credentials', 'tenant-creds')
+
+    assert overlay.make('db') == 'conn(tenant-creds)'
+    assert overlay.make('repository') == 'repo[conn(tenant-creds)]'
+    assert overlay.make('clock') is clock
+    assert base.make('repository') == 'repo[conn(default-creds)]'
+
+    with overlay.pool_scope():
+        parser = overlay.make('parser')
+    with base.borrow('parser') as borrowed:
+        assert borrowed is parser
+
+
+def test_pooled_acquire_waits_outside_the_container_lock():
+    import threading
+    from .exception import PoolExhaustedException
+
+    class Parser:
+        pass
+
+    c = Container()
+    c.bind('config', lambda: 'config')
+    c.bind('consumer', lambda app: app.make(Parser))
+    c.pooled(Parser, max_size=1)
+    borrowed = threading.Event()
+    waited = []
+
+    def wait_for_parser():
+        borrowed.wait(5)
+        with c.pool_scope():
+            waited.append(c.make(Parser))
+
+    waiter = threading.Thread(target=wait_for_parser)
+    waiter.start()
+
+    with c.pool_scope():
+        parser = c.make(Parser)
+        borrowed.set()
+        waiter.join(0.05)
+        assert c.make('config') == 'config'
+
+        with c.pool_scope():
+            try:
+                c.make('consumer')
+                assert False
+            except PoolExhaustedException:
+                pass
+
+    waiter.join(5)
+    assert waited == [parser]
+
+
+def test_resolved_singletons_skip_the_container_lock():
+    import threading
+
+    c = Container()
+    c.singleton('config', lambda: {'debug': True})
+    config = c.make('config')
+    locked = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with c._lock:
+            locked.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait(5)
+    try:
+        assert c.make('config') is config
+    finally:
+        release.set()
+        holder.join(5)
+
+
+def test_pool_scope_releases_every_instance_when_a_reset_fails():
+    def reset(instance):
+        if instance == 'a':
+            raise ValueError()
+
+    c = Container()
+    c.pooled('a', lambda: 'a', reset=reset)
+    c.pooled('b', lambda: 'b')
+
+    try:
+        with c.pool_scope():
+            c.make('a')
+            c.make('b')
+        assert False
+    except ValueError:
+        pass
+
+    assert c.get_pool('b').get_stats()['idle'] == 1
+    assert c.get_pool('a').get_stats()['discarded'] == 1
+
+
+def test_tenant_overlay_rollback_and_forget_instances():
+    from .overlay import ContainerOverlay
+
+    class Client:
+        def __init__(self, region='eu'):
+            self.region = region
+
+    base = Container()
+    base.instance('credentials', 'default-creds')
+    base.singleton('db', lambda app: 'conn({0})'.format(app.make('credentials')))
+    base.bind(Client)
+    base.memoize(Client)
+    base.make('db')
+
+    overlay = ContainerOverlay(base, 'a')
+    overlay.instance('credentials', 'tenant-creds')
+
+    try:
+        with overlay.batch():
+            overlay.instance('credentials', 'rolled-back')
+            overlay.bind('extra', lambda: 1)
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert overlay.make('credentials') == 'tenant-creds'
+    assert not overlay.bound('extra')
+    assert overlay.make('db') == 'conn(tenant-creds)'
+
+    overlay.forget_instances()
+    assert overlay.make('db') == 'conn(default-creds)'
+
+    client = overlay.make_with(Client, {'region': 'us'})
+    assert overlay.make_with(Client, {'region': 'us'}) is client
+    assert base.make_with(Client, {'region': 'us'}) is not client
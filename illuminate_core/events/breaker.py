@@ -0,0 +1,68 @@
+import threading
+from typing import Any, Dict, Optional
+
+from .scheduler import Clock
+
+
+class CircuitBreaker:
+    """
+    Skip a failing listener for a while.
+
+    The breaker opens after the given number of consecutive failures (errors or
+    timeouts) and skips the listener until reset_timeout seconds have passed.
+    It then lets a single trial call through: success closes the breaker again,
+    another failure re-opens it.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    failureThreshold: int
+    resetTimeout: float
+    state: str = CLOSED
+
+    def __init__(self, failures: int = 5, reset_timeout: float = 30.0, clock: Optional[Clock] = None):
+        self.failureThreshold = failures
+        self.resetTimeout = reset_timeout
+        self.clock = clock if clock is not None else Clock()
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.openedAt = 0.0
+        self.counters: Dict[str, int] = {'calls': 0, 'failures': 0, 'timeouts': 0, 'skipped': 0, 'opened': 0}
+
+    def allow(self) -> bool:
+        """
+        Determine if the listener may be called now.
+        """
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.clock.now() - self.openedAt < self.resetTimeout:
+                    self.counters['skipped'] += 1
+                    return False
+                self.state = self.HALF_OPEN
+            elif self.state == self.HALF_OPEN:
+                self.counters['skipped'] += 1
+                return False
+
+            self.counters['calls'] += 1
+            return True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self, timeout: bool = False) -> None:
+        with self.lock:
+            self.failures += 1
+            self.counters['timeouts' if timeout else 'failures'] += 1
+
+            if self.state == self.HALF_OPEN or self.failures >= self.failureThreshold:
+                self.state = self.OPEN
+                self.openedAt = self.clock.now()
+                self.counters['opened'] += 1
+
+    def get_state(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.counters, state=self.state, consecutive_failures=self.failures)
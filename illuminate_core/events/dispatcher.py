@@ -1,9 +1,34 @@
-from typing import Any, Callable, Dict, List, Union, Optional
+import asyncio
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import warnings
+import weakref
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from concurrent.futures import Executor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Set, Tuple, Union, Optional
 
 from illuminate_core.contract.container import Container as ContainerContract
 from illuminate_core.container import Container
 from illuminate_core.container.types import ClassAnnotation
 from illuminate_core.support.utils import call_user_func
+from .breaker import CircuitBreaker
+from .journal import EventJournal
+from .limiter import Coalescer, Debouncer, DeferredListener, Throttler
+from .metrics import DispatcherMetrics
+from .partitioned import Partitioner
+from .queued import ListenerQueue
+from .scheduler import Clock, ScheduledHandle, Scheduler
+from .subscription import Subscription
+from .transport import EventBus, Transport, decode_batch
+from .wildcard import WildcardMatcher
+
+logger = logging.getLogger(__name__)
 
 
 Events = Union[List[str], str]
@@ -11,45 +36,281 @@ Events = Union[List[str], str]
 
 class Dispatcher:
     container: ContainerContract
-    listeners: Dict[str, List[Any]]
-    wildcards: Dict[str, List[Any]]
+    listeners: Dict[ClassAnnotation, Dict[int, Callable]]
+    wildcards: Dict[str, Dict[int, Callable]]
+    wildcardMatcher: WildcardMatcher
+    wildcardsCache: 'OrderedDict[str, List[Any]]'
+    wildcardsCacheSize: int = 4096
+    version: int = 0
+    listenersCache: 'OrderedDict[ClassAnnotation, Tuple[int, Tuple[Callable, ...]]]'
+    listenersCacheSize: int = 4096
+    parsedClassCallables: Dict[ClassAnnotation, List]
+    scopedListeners: 'ContextVar[Optional[Dict[Tuple[ClassAnnotation, str], Callable]]]'
+    executor: Optional[Executor] = None
+    listenerQueue: Optional[ListenerQueue] = None
+    metrics: Optional[DispatcherMetrics] = None
+    partitioner: Optional[Partitioner] = None
+    buses: List[EventBus]
+    scheduler: Optional[Scheduler] = None
+    timeoutWorkers: int = 8
+    timeoutExecutor: Optional[ThreadPoolExecutor] = None
+    timeoutSlots: Optional[threading.BoundedSemaphore] = None
+    breakers: Dict[Tuple[Any, int], CircuitBreaker]
+    deferredListeners: List[DeferredListener]
+    pushed: Dict[str, Deque[Tuple[Any, ...]]]
+    pushedKeys: Dict[str, Set[Tuple[Any, ...]]]
 
     def __init__(self, container: ContainerContract = None):
         self.container = container if container is not None else Container()
-        self.listeners: Dict[str, List[Any]] = {}
-        self.wildcards: Dict[str, List[Any]] = {}
+        self.listeners: Dict[ClassAnnotation, Dict[int, Callable]] = {}
+        self.wildcards: Dict[str, Dict[int, Callable]] = {}
+        self.listenerKeys = itertools.count()
+        self.wildcardMatcher = WildcardMatcher()
+        self.wildcardsCache: 'OrderedDict[str, List[Any]]' = OrderedDict()
+        self.version = 0
+        self.listenersCache: 'OrderedDict[ClassAnnotation, Tuple[int, Tuple[Callable, ...]]]' = OrderedDict()
+        self.parsedClassCallables: Dict[ClassAnnotation, List] = {}
+        self.scopedListeners = ContextVar('scopedListeners', default=None)
+        self.pushed: Dict[str, Deque[Tuple[Any, ...]]] = {}
+        self.pushedKeys: Dict[str, Set[Tuple[Any, ...]]] = {}
+        self.buses: List[EventBus] = []
+        self.breakers: Dict[Tuple[Any, int], CircuitBreaker] = {}
+        self.deferredListeners: List[DeferredListener] = []
+        self.timeoutLock = threading.Lock()
+        self.timeoutCounters: Dict[str, int] = {'timeouts': 0, 'saturated': 0}
+
+    def listen(
+            self,
+            events: Events,
+            listener: Any,
+            lifetime: Optional[str] = None,
+            queued: bool = False,
+            timeout: Optional[float] = None,
+            breaker: Union[CircuitBreaker, bool, None] = None,
+            weak: bool = False,
+            debounce: Optional[float] = None,
+            throttle: Optional[Tuple[int, float]] = None,
+            coalesce: Optional[Callable[..., Any]] = None,
+            coalesce_wait: Optional[float] = None
+    ) -> Subscription:
+        """
+        Register a listener, returning a handle which removes it again.
+
+        Class listeners are resolved on every event unless the lifetime is
+        'singleton' (resolved once) or 'scoped' (once per scope()). Queued
+        listeners run on the listener queue instead of inside dispatch(). A
+        timeout runs the listener on the timeout executor and stops waiting for
+        it after that many seconds; a breaker skips it after repeated failures.
+        A weak listener is only weakly referenced, even when queued, and
+        unsubscribes itself once its target is garbage collected; being a
+        callable rather than a class, it cannot be given a lifetime.
+
+        Debounce calls the listener once after that many quiet seconds, throttle
+        is a (limit, interval) pair allowing limit calls per interval, and
+        coalesce is a key function keeping the latest payload per key until
+        coalesce_wait seconds pass; only one of them may be given. Held back
+        calls also run on flush_deferred().
+        """
+        if sum(option is not None for option in (debounce, throttle, coalesce)) > 1:
+            raise ValueError("Only one of debounce, throttle and coalesce may be given")
+
+        if weak and lifetime is not None:
+            raise ValueError("Weak listeners are callables and have no lifetime")
+
+        if self.partitioner is not None and self.partitioner.processes:
+            raise RuntimeError("Cannot add listeners once process partitions have forked the dispatcher")
 
-    def listen(self, events: Events, listener: Any) -> None:
         if not isinstance(events, list):
             events = [events]
+
+        entries = []
+        subscription = Subscription(self, entries)
+
         for event in events:
-            if '*' in event:
-                self.setup_wildcard_listener(event, listener)
+            wildcard = isinstance(event, str) and '*' in event
+            if weak:
+                made = self.create_weak_listener(listener, wildcard, subscription)
+                if queued:
+                    # Queue the weak closure itself, so the queue never holds the target strongly.
+                    made = self.create_queued_listener(made.target, made, wildcard)
+            else:
+                made = self.make_listener(listener, wildcard, lifetime, queued)
+
+            key = next(self.listenerKeys)
+
+            if timeout is not None or breaker:
+                guard = CircuitBreaker() if breaker is True else breaker
+                made = self.create_guarded_listener(made, timeout, guard)
+                if guard:
+                    self.breakers[(event, key)] = guard
+
+            if debounce is not None:
+                made = self.defer_listener(Debouncer(made, self.get_scheduler, debounce))
+            elif throttle is not None:
+                made = self.defer_listener(Throttler(made, self.get_scheduler, *throttle))
+            elif coalesce is not None:
+                made = self.defer_listener(Coalescer(made, self.get_scheduler, coalesce, coalesce_wait))
+
+            made.entry = (event, key)
+
+            if wildcard:
+                self.setup_wildcard_listener(event, made, key)
             else:
                 if event not in self.listeners:
-                    self.listeners[event] = []
-                self.listeners[event].append(self.make_listener(listener))
+                    self.listeners[event] = {}
+                self.listeners[event][key] = made
+            entries.append((event, key))
+        self.version += 1
+
+        return subscription
+
+    def setup_wildcard_listener(self, event, listener, key: Optional[int] = None):
+        if key is None:
+            key = next(self.listenerKeys)
+        if event not in self.wildcards:
+            self.wildcards[event] = {}
+            self.wildcardMatcher.add(event)
+        self.wildcards[event][key] = listener
+        self.wildcardsCache = OrderedDict()
+
+    def defer_listener(self, listener: DeferredListener) -> DeferredListener:
+        self.deferredListeners.append(listener)
+        return listener
+
+    def flush_deferred(self) -> None:
+        """
+        Run every debounced, throttled or coalesced call still being held back.
+        """
+        for listener in list(self.deferredListeners):
+            listener.flush()
+
+    def shutdown(self) -> None:
+        """
+        Flush the held back calls and stop every background worker of the dispatcher.
+        """
+        self.flush_deferred()
+
+        if self.listenerQueue is not None:
+            self.listenerQueue.shutdown()
+        if self.partitioner is not None:
+            self.partitioner.shutdown()
+            self.partitioner = None
+        for bus in self.buses:
+            bus.close()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.timeoutExecutor is not None:
+            self.timeoutExecutor.shutdown(False)
+
+    def remove_listener(self, event: ClassAnnotation, key: int) -> None:
+        """
+        Remove a single registered listener.
+        """
+        wildcard = isinstance(event, str) and '*' in event
+        table = self.wildcards if wildcard else self.listeners
+
+        listeners = table.get(event)
+        removed = None if listeners is None else listeners.pop(key, None)
+        if removed is None:
+            return
+
+        self.forget_deferred(removed)
+        self.breakers.pop((event, key), None)
+
+        if len(listeners) == 0:
+            self.forget(event)
+        elif wildcard:
+            self.wildcardsCache = OrderedDict()
+        self.version += 1
+
+    def create_weak_listener(self, listener: Callable, wildcard: bool, subscription: Subscription) -> Callable:
+        """
+        Make a listener holding only a weak reference to its target.
+        """
+        if inspect.ismethod(listener):
+            reference = weakref.WeakMethod(listener, subscription)
+        else:
+            reference = weakref.ref(listener, subscription)
 
-    def setup_wildcard_listener(self, event, listener):
-        self.wildcards[event].append(self.make_listener(listener))
+        def closure(event, *payload):
+            target = reference()
+            if target is None:
+                return None
+            if wildcard:
+                return call_user_func(target, event, payload)
+            return call_user_func(target, *payload)
 
-    def has_listeners(self, event: str) -> bool:
-        return event in self.listeners or event in self.wildcards
+        closure.asynchronous = inspect.iscoroutinefunction(listener)
+        closure.target = getattr(listener, '__qualname__', repr(listener))
 
-    def push(self, event: str, payload: List[Any] = None) -> None:
-        if payload is None:
-            payload = []
+        return closure
 
-        def closure():
-            self.dispatch(event, payload)
-        self.listen(event + '__pushed', closure)
+    def has_listeners(self, event: ClassAnnotation) -> bool:
+        """
+        Determine if any listener, wildcard or inherited, would receive the event.
+        """
+        return len(self.get_listeners(event)) > 0
+
+    def has_any_listeners(self) -> bool:
+        """
+        Determine if any listener at all is registered.
+        """
+        return len(self.listeners) > 0 or len(self.wildcards) > 0
+
+    def push(self, event: str, payload: Any = None, coalesce: bool = False) -> None:
+        """
+        Buffer a payload for the event until it is flushed. When coalescing,
+        a payload equal to one already buffered is skipped.
+        """
+        payload = self.normalize_payload(payload)
+
+        if event not in self.pushed:
+            self.pushed[event] = deque()
+
+        if coalesce and self.is_pushed(event, payload):
+            return
+
+        if event in self.pushedKeys:
+            self.remember_pushed(event, payload)
+
+        self.pushed[event].append(payload)
+
+    def is_pushed(self, event: str, payload: Tuple[Any, ...]) -> bool:
+        if event not in self.pushedKeys:
+            self.pushedKeys[event] = set()
+            for pushed in self.pushed[event]:
+                self.remember_pushed(event, pushed)
+
+        try:
+            return payload in self.pushedKeys[event]
+        except TypeError:
+            return payload in self.pushed[event]
+
+    def remember_pushed(self, event: str, payload: Tuple[Any, ...]) -> None:
+        try:
+            self.pushedKeys[event].add(payload)
+        except TypeError:
+            pass
+
+    def flush(self, event: str) -> List[List[Any]]:
+        """
+        Dispatch every payload buffered for the event.
+        """
+        payloads = self.pushed.pop(event, ())
+        self.pushedKeys.pop(event, None)
+
+        return self.dispatch_many(event, payloads)
+
+    def normalize_payload(self, payload: Any) -> Tuple[Any, ...]:
+        if payload is None:
+            return ()
 
-    def flush(self, event: str) -> None:
-        self.dispatch(event + '__pushed')
+        return tuple(payload) if isinstance(payload, (list, tuple)) else (payload,)
 
     def subscribe(self, subscriber: Any):
         subscriber = self.resolve_subscriber(subscriber)
         subscriber.subscribe(self)
+        self.version += 1
 
     def resolve_subscriber(self, subscriber) -> Any:
         if type(subscriber) is type and isinstance(subscriber, str):
@@ -57,28 +318,231 @@ class Dispatcher:
 
         return subscriber
 
-    def until(self, event: str, payload: List[Any] = None):
-        if payload is None:
-            payload = []
+    def until(self, event: str, payload: Any = None):
+        return self.fire(event, payload, True)
 
-        self.dispatch(event, payload, True)
+    def fire(self, event: str, payload: Any = None, halt: bool = False):
+        return self.dispatch(event, *self.normalize_payload(payload), halt=halt)
 
-    def fire(self, event: str, payload: List[Any] = None, halt: bool = False):
+    def dispatch(self, event: str, *payload, halt: bool = False) -> Optional[List[Any]]:
         if payload is None:
             payload = []
 
-        self.dispatch(event, payload, halt)
+        event, payload = self.parse_event_and_payload(event, payload)
 
-    def dispatch(self, event: str, *payload, halt: bool = False) -> Optional[List[Any]]:
-        if payload is None:
-            payload = []
+        if len(self.buses) > 0:
+            self.publish_remote(event, payload)
+
+        return self.invoke_listeners(self.get_listeners(event), event, payload, halt)
+
+    def dispatch_lazy(self, event: str, factory: Callable[[], Any], halt: bool = False) -> Optional[List[Any]]:
+        """
+        Dispatch an event whose payload is only built when someone listens.
+        """
+        listeners = self.get_listeners(event)
+        remote = len(self.buses) > 0 and any(bus.should_publish(event) for bus in self.buses)
+
+        if len(listeners) == 0 and not remote:
+            return None if halt else []
+
+        payload = self.normalize_payload(factory())
+
+        if remote:
+            self.publish_remote(event, payload)
+
+        return self.invoke_listeners(listeners, event, payload, halt)
+
+    def dispatch_many(self, event: str, payloads: Iterable[Any], halt: bool = False) -> List[Optional[List[Any]]]:
+        """
+        Dispatch the event once per payload, resolving its listeners only once.
+        """
+        listeners = self.get_listeners(event)
+        responses = []
+
+        for payload in payloads:
+            payload = self.normalize_payload(payload)
+            if len(self.buses) > 0:
+                self.publish_remote(event, payload)
+            responses.append(self.invoke_listeners(listeners, event, payload, halt))
+
+        return responses
+
+    def publish(self, events: Events, transport: Transport, **options) -> EventBus:
+        """
+        Also send the given events, wildcards allowed, to a peer dispatcher through the transport.
+        """
+        if not isinstance(events, list):
+            events = [events]
+
+        bus = EventBus(transport, events, **options)
+        self.buses.append(bus)
+
+        return bus
+
+    def journal(self, events: Events, journal: EventJournal) -> None:
+        """
+        Append the given events, wildcards allowed, to the journal as they are dispatched.
+        """
+        if not isinstance(events, list):
+            events = [events]
+
+        for event in events:
+            if isinstance(event, str) and '*' in event:
+                self.listen(event, journal.listener)
+            else:
+                self.listen(event, functools.partial(self.journal_event, journal, event))
+
+    def journal_event(self, journal: EventJournal, event: ClassAnnotation, *payload) -> None:
+        journal.listener(event, payload)
+
+    def receive_from(self, transport: Transport) -> None:
+        """
+        Dispatch the event batches arriving on the transport to the local listeners.
+        """
+        transport.start(self.receive_remote)
+
+    def publish_remote(self, event: ClassAnnotation, payload: Tuple[Any, ...]) -> None:
+        for bus in self.buses:
+            if bus.should_publish(event):
+                bus.publish(event, tuple(payload))
+
+    def receive_remote(self, data: bytes) -> None:
+        for event, payload in decode_batch(data):
+            self.invoke_listeners(self.get_listeners(event), event, payload)
+
+    def invoke_listeners(self, listeners: Iterable[Callable], event: ClassAnnotation, payload: Tuple[Any, ...], halt: bool = False) -> Optional[List[Any]]:
+        if self.metrics is not None:
+            return self.invoke_listeners_measured(listeners, event, payload, halt)
+
+        responses = []
+
+        for listener in listeners:
+            response = listener(event, *payload)
+
+            if halt and response is not None:
+                return [response]
+
+            if response is False:
+                break
+
+            responses.append(response)
+
+        return None if halt else responses
+
+    def invoke_listeners_measured(self, listeners: Iterable[Callable], event: ClassAnnotation, payload: Tuple[Any, ...], halt: bool = False) -> Optional[List[Any]]:
+        metrics = self.metrics
+        metrics.record_dispatch(event)
+        responses = []
+
+        for listener in listeners:
+            started = time.perf_counter()
+            response = listener(event, *payload)
+            metrics.record_listener(event, listener, time.perf_counter() - started)
+
+            if halt and response is not None:
+                metrics.record_halted()
+                return [response]
+
+            if response is False:
+                metrics.record_stopped()
+                break
+
+            responses.append(response)
+
+        return None if halt else responses
+
+    def enable_metrics(self, slow_threshold: Optional[float] = None, **options) -> DispatcherMetrics:
+        """
+        Start recording dispatch counts and listener latencies.
+        """
+        self.metrics = DispatcherMetrics(slow_threshold=slow_threshold, **options)
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        self.metrics = None
+
+    def dispatch_later(self, event: str, payload: Any = None, delay: float = 0.0) -> ScheduledHandle:
+        """
+        Dispatch the event once the delay, in seconds, has passed.
+        """
+        return self.get_scheduler().call_later(delay, self.fire, event, payload)
+
+    def schedule(self, event: str, payload: Any = None, interval: float = 60.0, delay: Optional[float] = None) -> ScheduledHandle:
+        """
+        Dispatch the event every interval seconds, first after the delay (one interval by default).
+        """
+        delay = interval if delay is None else delay
+
+        return self.get_scheduler().call_later(delay, self.fire, event, payload, interval=interval)
+
+    def get_scheduler(self) -> Scheduler:
+        if self.scheduler is None:
+            self.scheduler = Scheduler()
+
+        return self.scheduler
+
+    def use_clock(self, clock: Clock) -> Scheduler:
+        """
+        Drive the delayed dispatches from the given clock, e.g. a ManualClock in tests.
+        """
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+        self.scheduler = Scheduler(clock)
+
+        return self.scheduler
+
+    def partition(self, key: Callable[..., Any], partitions: int = 4, processes: bool = False, max_size: int = 1024) -> Partitioner:
+        """
+        Enable partitioned dispatch, keeping the order of events sharing a key.
+
+        Process partitions fork the dispatcher as it is, so register every
+        listener first. Partitioning again shuts the previous workers down.
+        """
+        if self.partitioner is not None:
+            self.partitioner.shutdown()
+            self.partitioner = None
+
+        self.partitioner = Partitioner(self, key, partitions, processes, max_size)
+        return self.partitioner
+
+    def dispatch_partitioned(self, event: str, *payload) -> int:
+        """
+        Hand the event to the worker of its partition, returning the partition index.
+        """
+        if self.partitioner is None:
+            raise RuntimeError("Partitioned dispatch has not been enabled")
 
         event, payload = self.parse_event_and_payload(event, payload)
 
+        return self.partitioner.submit(event, tuple(payload))
+
+    async def dispatch_async(self, event: str, *payload, halt: bool = False, concurrent: bool = False, offload: bool = False) -> Optional[List[Any]]:
+        """
+        Dispatch an event on the running loop, awaiting coroutine listeners.
+
+        Sequential mode keeps the halt and False-stops-propagation semantics of
+        dispatch(). With concurrent=True all listeners run together through
+        asyncio.gather and halt returns the first non-None response in listener
+        order. With offload=True sync listeners run on the executor.
+        """
+        event, payload = self.parse_event_and_payload(event, payload)
+
+        if len(self.buses) > 0:
+            self.publish_remote(event, payload)
+
+        listeners = self.get_listeners(event)
+
+        if concurrent:
+            responses = await asyncio.gather(*(self.call_listener_async(listener, event, payload, offload) for listener in listeners))
+            if halt:
+                return next(([response] for response in responses if response is not None), None)
+            return list(responses)
+
         responses = []
 
-        for listener in self.get_listeners(event):
-            response = call_user_func(listener, event, *payload)
+        for listener in listeners:
+            response = await self.call_listener_async(listener, event, payload, offload)
 
             if halt and response is not None:
                 return [response]
@@ -90,39 +554,98 @@ class Dispatcher:
 
         return None if halt else responses
 
+    async def call_listener_async(self, listener: Callable, event: ClassAnnotation, payload: List[Any], offload: bool = False) -> Any:
+        if offload and not getattr(listener, 'asynchronous', False):
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(self.executor, functools.partial(listener, event, *payload))
+        else:
+            response = listener(event, *payload)
+
+        if inspect.isawaitable(response):
+            response = await response
+
+        return response
+
     def parse_event_and_payload(self, event, payload):
         if hasattr(event, '__class__') and not isinstance(event, str):
             payload, event = [event], event.__class__
 
         return [event, payload]
 
-    def get_listeners(self, event: ClassAnnotation) -> List:
-        listeners = self.listeners[event] if event in self.listeners else []
+    def get_listeners(self, event: ClassAnnotation) -> Tuple[Callable, ...]:
+        cached = self.get_cached(self.listenersCache, event)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        listeners = list(self.listeners[event].values()) if event in self.listeners else []
 
         listeners = listeners + self.get_wildcard_listeners(event)
 
-        return self.add_interface_listeners(event, listeners) if type(event) is type else listeners
+        if type(event) is type:
+            listeners = self.add_interface_listeners(event, listeners)
+
+        listeners = tuple(listeners)
+        self.put_cached(self.listenersCache, event, (self.version, listeners), self.listenersCacheSize)
+
+        return listeners
 
     def get_wildcard_listeners(self, event: ClassAnnotation) -> List:
-        wildcards = []
+        if not isinstance(event, str):
+            return []
 
-        for key, listeners in self.wildcards:
-            if key in event:
-                wildcards += listeners
+        wildcards = self.get_cached(self.wildcardsCache, event)
+        if wildcards is None:
+            started = time.perf_counter()
+            wildcards = []
+            for pattern in self.wildcardMatcher.match(event):
+                wildcards += self.wildcards[pattern].values()
+
+            if self.metrics is not None:
+                self.metrics.record_wildcard_match(time.perf_counter() - started)
+            self.put_cached(self.wildcardsCache, event, wildcards, self.wildcardsCacheSize)
 
         return wildcards
 
+    def get_cached(self, cache: 'OrderedDict', key: Any) -> Any:
+        """
+        Look a key up in a least recently used cache, marking it as recently used.
+        """
+        value = cache.get(key)
+        if value is not None:
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                pass
+
+        return value
+
+    def put_cached(self, cache: 'OrderedDict', key: Any, value: Any, size: int) -> None:
+        """
+        Store a value in a least recently used cache, evicting the oldest entries beyond size.
+        """
+        cache[key] = value
+        while len(cache) > size:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+
     def add_interface_listeners(self, event: ClassAnnotation, listeners: List = None) -> List:
-        for interface in event.__bases__:
+        """
+        Add the listeners registered on any ancestor of a class based event, nearest first.
+        """
+        for interface in event.__mro__[1:]:
             if interface in self.listeners:
-                for names in self.listeners[interface]:
-                    listeners = listeners + names
+                listeners = listeners + list(self.listeners[interface].values())
 
         return listeners
 
-    def make_listener(self, listener: Union[Callable, ClassAnnotation], wildcard: bool = False) -> Callable:
+    def make_listener(self, listener: Union[Callable, ClassAnnotation], wildcard: bool = False, lifetime: Optional[str] = None, queued: bool = False) -> Callable:
+        if queued:
+            return self.create_queued_listener(listener, self.make_listener(listener, wildcard, lifetime), wildcard)
+
         if not callable(listener) or type(listener) is type:
-            return self.create_class_listener(listener, wildcard)
+            return self.create_class_listener(listener, wildcard, lifetime)
 
         def closure(event, *payload):
             if payload is None:
@@ -132,35 +655,224 @@ class Dispatcher:
             else:
                 return call_user_func(listener, *payload)
 
+        closure.asynchronous = inspect.iscoroutinefunction(listener)
+        closure.target = listener
+
         return closure
 
-    def create_class_listener(self, listener: ClassAnnotation, wildcard: bool = False) -> Callable:
-        def closure(event, payload):
+    def create_guarded_listener(self, made: Callable, timeout: Optional[float] = None, breaker: Union[CircuitBreaker, bool, None] = None) -> Callable:
+        """
+        Wrap a listener with a time budget and a circuit breaker.
+        """
+        if breaker is True:
+            breaker = CircuitBreaker()
+
+        def closure(event, *payload):
+            slots = None
+            if timeout is not None:
+                self.get_timeout_executor()
+                slots = self.timeoutSlots
+                if not slots.acquire(blocking=False):
+                    self.count_timeout('saturated')
+                    logger.warning("Skipped listener %r of [%s]: all timeout workers are busy", closure.target, event)
+                    return None
+
+            if breaker and not breaker.allow():
+                if slots is not None:
+                    slots.release()
+                return None
+
+            try:
+                if slots is None:
+                    response = made(event, *payload)
+                else:
+                    future = self.timeoutExecutor.submit(made, event, *payload)
+                    future.add_done_callback(lambda _: slots.release())
+
+                    try:
+                        response = future.result(timeout)
+                    except FutureTimeoutError:
+                        if not future.done():
+                            self.count_timeout('timeouts')
+                            if breaker:
+                                breaker.record_failure(True)
+                            return None
+                        response = future.result()
+            except Exception:
+                if breaker:
+                    breaker.record_failure()
+                raise
+
+            if breaker:
+                breaker.record_success()
+
+            return response
+
+        closure.asynchronous = False
+        closure.target = getattr(made, 'target', made)
+
+        return closure
+
+    def get_timeout_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the executor running listeners with a timeout, along with the slots bounding it.
+        """
+        with self.timeoutLock:
+            if self.timeoutExecutor is None:
+                self.timeoutSlots = threading.BoundedSemaphore(self.timeoutWorkers)
+                self.timeoutExecutor = ThreadPoolExecutor(self.timeoutWorkers, 'listener-timeout')
+
+        return self.timeoutExecutor
+
+    def count_timeout(self, counter: str) -> None:
+        with self.timeoutLock:
+            self.timeoutCounters[counter] += 1
+
+    def get_timeout_stats(self) -> Dict[str, int]:
+        """
+        Count the listener calls that timed out and those skipped because every timeout worker was busy.
+        """
+        with self.timeoutLock:
+            return dict(self.timeoutCounters)
+
+    def get_breaker_states(self) -> Dict[Tuple[Any, int], Dict[str, Any]]:
+        """
+        Get the state of every listener circuit breaker, keyed by the (event, key) entries of its subscription.
+        """
+        return {entry: breaker.get_state() for entry, breaker in self.breakers.items()}
+
+    def create_queued_listener(self, listener: Union[Callable, ClassAnnotation], made: Callable, wildcard: bool = False) -> Callable:
+        """
+        Wrap a listener so that dispatching only hands it to the listener queue.
+        """
+        is_function = callable(listener) and type(listener) is not type
+
+        def closure(event, *payload):
+            queue = self.get_listener_queue()
+
+            if queue.processes and is_function:
+                args = (event, payload) if wildcard else payload
+                queue.submit(call_user_func, listener, *args)
+            else:
+                queue.submit(made, event, *payload)
+
+        closure.asynchronous = False
+        closure.target = listener
+
+        return closure
+
+    def get_listener_queue(self) -> ListenerQueue:
+        if self.listenerQueue is None:
+            self.listenerQueue = ListenerQueue()
+
+        return self.listenerQueue
+
+    def create_class_listener(self, listener: ClassAnnotation, wildcard: bool = False, lifetime: Optional[str] = None) -> Callable:
+        resolve = self.create_class_callable_resolver(listener, lifetime)
+
+        def closure(event, *payload):
             if wildcard:
-                return call_user_func(self.create_class_callable(listener), event, payload)
+                return call_user_func(resolve(), event, payload)
             else:
-                return call_user_func(self.create_class_callable(listener), *payload)
+                return call_user_func(resolve(), *payload)
+
+        cls, method = self.parse_class_callable(listener)
+        closure.asynchronous = inspect.iscoroutinefunction(getattr(cls, method, None)) if isinstance(cls, type) else None
+        closure.target = listener
 
         return closure
 
-    def create_class_callable(self, listener: ClassAnnotation) -> Callable:
+    def create_class_callable_resolver(self, listener: ClassAnnotation, lifetime: Optional[str] = None) -> Callable[[], Callable]:
+        """
+        Get a function returning the bound listener method for the given lifetime.
+        """
         cls, method = self.parse_class_callable(listener)
-        instance = self.container.make(cls)
-        return getattr(instance, method)
+
+        def transient():
+            return getattr(self.container.make(cls), method)
+
+        if lifetime == 'singleton':
+            resolved = []
+
+            def singleton():
+                if len(resolved) == 0:
+                    resolved.append(transient())
+                return resolved[0]
+
+            return singleton
+
+        if lifetime == 'scoped':
+            key = (cls, method)
+
+            def scoped():
+                listeners = self.scopedListeners.get()
+                if listeners is None:
+                    return transient()
+                if key not in listeners:
+                    listeners[key] = transient()
+                return listeners[key]
+
+            return scoped
+
+        return transient
+
+    @contextmanager
+    def scope(self) -> Iterator['Dispatcher']:
+        """
+        Share the 'scoped' class listener instances until the scope exits.
+
+        Scopes are tracked per thread and per asyncio task.
+        """
+        token = self.scopedListeners.set({})
+        try:
+            yield self
+        finally:
+            self.scopedListeners.reset(token)
+
+    def create_class_callable(self, listener: ClassAnnotation) -> Callable:
+        """
+        Resolve the bound listener method of a class listener.
+
+        Deprecated, use create_class_callable_resolver() instead.
+        """
+        warnings.warn(
+            "create_class_callable() is deprecated, use create_class_callable_resolver()",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        return self.create_class_callable_resolver(listener)()
 
     def parse_class_callable(self, listener: ClassAnnotation) -> List:
-        if isinstance(listener, str):
-            return '@'.split(listener, 2)
-        else:
-            return [listener, 'handle']
+        if listener not in self.parsedClassCallables:
+            if isinstance(listener, str) and '@' in listener:
+                self.parsedClassCallables[listener] = listener.split('@', 1)
+            else:
+                self.parsedClassCallables[listener] = [listener, 'handle']
+
+        return self.parsedClassCallables[listener]
 
     def forget(self, event: ClassAnnotation):
-        if '*' in event:
-            self.wildcards.pop(event, None)
+        if isinstance(event, str) and '*' in event:
+            removed = self.wildcards.pop(event, {})
+            self.wildcardMatcher.remove(event)
+            self.wildcardsCache = OrderedDict()
         else:
-            self.listeners.pop(event, None)
+            removed = self.listeners.pop(event, {})
+        self.version += 1
+
+        for key, listener in removed.items():
+            self.forget_deferred(listener)
+            self.breakers.pop((event, key), None)
+
+    def forget_deferred(self, listener: Callable) -> None:
+        """
+        Drop the calls a removed listener was still holding back.
+        """
+        if isinstance(listener, DeferredListener) and listener in self.deferredListeners:
+            listener.unschedule()
+            self.deferredListeners.remove(listener)
 
     def forget_pushed(self):
-        for key in self.listeners.keys():
-            if key.endswith('__pushed'):
-                self.forget(key)
\ No newline at end of file
+        self.pushed = {}
+        self.pushedKeys = {}
+        self.version += 1
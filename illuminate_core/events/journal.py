@@ -0,0 +1,290 @@
+import bisect
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+HEADER = struct.Struct('<IId')
+INDEX_ENTRY = struct.Struct('<dQ')
+
+Record = Tuple[int, float, Any, Tuple[Any, ...]]
+
+
+class Segment:
+    """
+    One preallocated journal file starting at a global offset.
+
+    Only the active segment is opened for writing and kept memory-mapped;
+    readers map a segment read-only for as long as they scan it.
+    """
+    base: int
+    path: str
+    size: int
+    map: Optional[mmap.mmap] = None
+
+    def __init__(self, directory: str, base: int, size: int):
+        self.base = base
+        self.path = os.path.join(directory, '{0:020d}.log'.format(base))
+        self.indexPath = os.path.join(directory, '{0:020d}.idx'.format(base))
+        self.index: List[Tuple[float, int]] = []
+
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as file:
+                file.truncate(size)
+        self.size = os.path.getsize(self.path)
+        self.position = 0
+        self.latest = float('-inf')
+
+        if os.path.exists(self.indexPath):
+            with open(self.indexPath, 'rb') as index:
+                data = index.read()
+            self.index = [INDEX_ENTRY.unpack_from(data, at) for at in range(0, len(data) - len(data) % INDEX_ENTRY.size, INDEX_ENTRY.size)]
+            if self.index:
+                self.latest = self.index[-1][0]
+
+    def open(self) -> None:
+        """
+        Map the segment for appending, finding where its last intact record ends.
+        """
+        self.file = open(self.path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), self.size)
+        self.indexFile = open(self.indexPath, 'ab')
+
+        if self.index:
+            self.position = self.index[-1][1] - self.base
+        for position, timestamp, _ in self.scan(self.map, self.position):
+            self.position = position
+            self.latest = max(self.latest, timestamp)
+
+    @contextmanager
+    def view(self) -> Iterator[mmap.mmap]:
+        """
+        Map the segment read-only for the duration of the block.
+        """
+        with open(self.path, 'rb') as file:
+            view = mmap.mmap(file.fileno(), self.size, access=mmap.ACCESS_READ)
+            try:
+                yield view
+            finally:
+                view.close()
+
+    def scan(self, view: mmap.mmap, position: int) -> Iterator[Tuple[int, float, bytes]]:
+        """
+        Walk the records from a position, yielding the position after each one.
+        """
+        while position + HEADER.size <= self.size:
+            length, checksum, timestamp = HEADER.unpack_from(view, position)
+            end = position + HEADER.size + length
+            if length == 0 or end > self.size:
+                return
+
+            body = view[position + HEADER.size:end]
+            if zlib.crc32(body) != checksum:
+                return
+
+            yield end, timestamp, body
+            position = end
+
+    def fits(self, length: int) -> bool:
+        return self.position + HEADER.size + length <= self.size
+
+    def write(self, body: bytes, timestamp: float) -> int:
+        offset = self.base + self.position
+        HEADER.pack_into(self.map, self.position, len(body), zlib.crc32(body), timestamp)
+        self.map[self.position + HEADER.size:self.position + HEADER.size + len(body)] = body
+        self.position += HEADER.size + len(body)
+        return offset
+
+    def add_index(self, timestamp: float, offset: int) -> None:
+        self.index.append((timestamp, offset))
+        self.indexFile.write(INDEX_ENTRY.pack(timestamp, offset))
+
+    def sync(self) -> None:
+        self.map.flush()
+        self.indexFile.flush()
+        os.fsync(self.indexFile.fileno())
+
+    def close(self) -> None:
+        """
+        Flush and unmap the segment, keeping only its index in memory.
+        """
+        if self.map is None:
+            return
+
+        self.sync()
+        self.map.close()
+        self.map = None
+        self.file.close()
+        self.indexFile.close()
+
+
+class EventJournal:
+    """
+    An append-only event journal kept in segmented, memory-mapped files.
+
+    append() only copies the record into the active segment, the only one
+    kept mapped; durability is governed by the sync mode: 'always' flushes
+    on every append, 'batch' group-commits from a background thread every
+    sync_interval seconds and 'never' leaves it to the operating system.
+    With 'always' the flush, fsync included, runs on the appending thread,
+    which for Dispatcher.journal() is the thread dispatching the event, so
+    every dispatch waits on the disk; prefer 'batch' on hot paths.
+
+    Every segment keeps a sparse index of (timestamp, offset) pairs, one per
+    index_interval bytes, used to find where replay starts without scanning
+    whole segments. Indexed timestamps are the latest record timestamp seen
+    so far, so they never decrease and stay searchable when the wall clock
+    steps back; records keep their own timestamps.
+    """
+    directory: str
+    segmentSize: int
+    sync: str
+    syncInterval: float
+    indexInterval: int
+    segments: List[Segment]
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, sync: str = 'batch', sync_interval: float = 0.05, index_interval: int = 64 * 1024):
+        if sync not in ('always', 'batch', 'never'):
+            raise ValueError("Unknown sync mode [{0}]".format(sync))
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segmentSize = segment_size
+        self.sync = sync
+        self.syncInterval = sync_interval
+        self.indexInterval = index_interval
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.local = threading.local()
+        self.closed = threading.Event()
+
+        bases = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith('.log'))
+        self.segments = [Segment(directory, base, segment_size) for base in bases] or [Segment(directory, 0, segment_size)]
+        self.segments[-1].open()
+        self.lastIndexed = self.segments[-1].index[-1][1] if self.segments[-1].index else -1
+        self.latest = max(segment.latest for segment in self.segments)
+
+        self.syncer: Optional[threading.Thread] = None
+        if sync == 'batch':
+            self.syncer = threading.Thread(target=self.work, name='event-journal-sync', daemon=True)
+            self.syncer.start()
+
+    def append(self, event: Any, payload: Tuple[Any, ...], timestamp: Optional[float] = None) -> int:
+        """
+        Append an event, returning its offset.
+        """
+        body = pickle.dumps((event, tuple(payload)), pickle.HIGHEST_PROTOCOL)
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self.lock:
+            segment = self.segments[-1]
+            if not segment.fits(len(body)):
+                segment = self.roll(len(body))
+
+            offset = segment.write(body, timestamp)
+            self.latest = max(self.latest, timestamp)
+            if self.lastIndexed < segment.base or offset - self.lastIndexed >= self.indexInterval:
+                segment.add_index(self.latest, offset)
+                self.lastIndexed = offset
+            self.dirty = True
+
+            if self.sync == 'always':
+                self.flush()
+
+        return offset
+
+    def listener(self, event: Any, payload: Tuple[Any, ...]) -> None:
+        """
+        Journal a dispatched event, skipping the events this thread is replaying.
+        """
+        if not self.is_replaying():
+            self.append(event, payload)
+
+    def is_replaying(self) -> bool:
+        return getattr(self.local, 'replaying', False)
+
+    def roll(self, length: int) -> Segment:
+        current = self.segments[-1]
+        current.close()
+        self.dirty = False
+        size = max(self.segmentSize, HEADER.size + length + 1)
+        segment = Segment(self.directory, current.base + current.size, size)
+        segment.open()
+        self.segments.append(segment)
+        return segment
+
+    def flush(self) -> None:
+        """
+        Make every appended record durable.
+        """
+        if self.dirty:
+            self.dirty = False
+            self.segments[-1].sync()
+
+    def work(self) -> None:
+        while not self.closed.wait(self.syncInterval):
+            with self.lock:
+                self.flush()
+
+    def read(self, offset: int = 0, since: Optional[float] = None) -> Iterator[Record]:
+        """
+        Stream the records from an offset or a timestamp, one at a time.
+        """
+        index = 0
+        if since is not None:
+            offset = max(offset, self.find_offset(since))
+
+        while index < len(self.segments) and self.segments[index].base + self.segments[index].size <= offset:
+            index += 1
+
+        for segment in self.segments[index:]:
+            position = max(offset - segment.base, 0)
+            with segment.view() as view:
+                for end, timestamp, body in segment.scan(view, position):
+                    if since is None or timestamp >= since:
+                        event, payload = pickle.loads(body)
+                        yield segment.base + position, timestamp, event, payload
+                    position = end
+
+    def find_offset(self, since: float) -> int:
+        """
+        Use the sparse index to find an offset at or before the first record at the timestamp.
+
+        The indexed timestamps never decrease, so bisecting them is safe even
+        for records appended while the wall clock stepped back.
+        """
+        offset = 0
+        for segment in self.segments:
+            timestamps = [timestamp for timestamp, _ in segment.index]
+            position = bisect.bisect_left(timestamps, since)
+            if position > 0:
+                offset = segment.index[position - 1][1]
+            if position < len(timestamps):
+                break
+
+        return offset
+
+    def replay(self, dispatcher: Any, offset: int = 0, since: Optional[float] = None) -> Iterator[int]:
+        """
+        Dispatch the journaled events through the dispatcher, yielding each offset as it is replayed.
+        """
+        for record_offset, _, event, payload in self.read(offset, since):
+            self.local.replaying = True
+            try:
+                dispatcher.dispatch(event, *payload)
+            finally:
+                self.local.replaying = False
+            yield record_offset
+
+    def close(self) -> None:
+        self.closed.set()
+        if self.syncer is not None:
+            self.syncer.join()
+
+        with self.lock:
+            self.segments[-1].close()
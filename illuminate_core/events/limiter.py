@@ -0,0 +1,154 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .scheduler import ScheduledHandle, Scheduler
+
+logger = logging.getLogger(__name__)
+
+Call = Tuple[Any, Tuple[Any, ...]]
+
+
+class DeferredListener(ABC):
+    """
+    A listener wrapper holding back some invocations until they are flushed.
+
+    Held back calls usually run on the scheduler thread, where nobody could
+    handle their errors, so a failing call is logged and the others still run.
+    """
+    listener: Callable
+    handle: Optional[ScheduledHandle] = None
+
+    def __init__(self, listener: Callable, scheduler: Callable[[], Scheduler]):
+        self.listener = listener
+        self.scheduler = scheduler
+        self.lock = threading.RLock()
+        self.handle = None
+        self.asynchronous = False
+        self.target = getattr(listener, 'target', listener)
+
+    def schedule(self, delay: float) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+        self.handle = self.scheduler().call_later(delay, self.flush)
+
+    def unschedule(self) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+    def call(self, pending: Call) -> None:
+        """
+        Run a held back call, logging its failure instead of raising it.
+        """
+        event, payload = pending
+        try:
+            self.listener(event, *payload)
+        except Exception:
+            logger.exception("Deferred listener %r failed handling %s", self.target, event)
+
+    @abstractmethod
+    def flush(self) -> None:
+        """
+        Run the calls being held back now.
+        """
+
+
+class Debouncer(DeferredListener):
+    """
+    Call the listener once, with the latest payload, after wait seconds without events.
+    """
+    def __init__(self, listener: Callable, scheduler: Callable[[], Scheduler], wait: float):
+        super().__init__(listener, scheduler)
+        self.wait = wait
+        self.pending: Optional[Call] = None
+
+    def __call__(self, event, *payload):
+        with self.lock:
+            self.pending = (event, payload)
+            self.schedule(self.wait)
+
+    def flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, None
+            self.unschedule()
+
+        if pending is not None:
+            self.call(pending)
+
+
+class Throttler(DeferredListener):
+    """
+    Call the listener at most limit times per interval seconds.
+
+    Calls over the limit collapse into one trailing call with the latest
+    payload, made as soon as the window has room again.
+    """
+    def __init__(self, listener: Callable, scheduler: Callable[[], Scheduler], limit: int, interval: float):
+        super().__init__(listener, scheduler)
+        self.limit = limit
+        self.interval = interval
+        self.calls: Deque[float] = deque()
+        self.pending: Optional[Call] = None
+
+    def acquire(self) -> Optional[float]:
+        """
+        Take a slot in the current window, or get the delay until one frees up.
+        """
+        now = self.scheduler().clock.now()
+        while len(self.calls) > 0 and self.calls[0] <= now - self.interval:
+            self.calls.popleft()
+
+        if len(self.calls) < self.limit:
+            self.calls.append(now)
+            return None
+
+        return self.calls[0] + self.interval - now
+
+    def __call__(self, event, *payload):
+        with self.lock:
+            delay = self.acquire()
+            if delay is not None:
+                if self.pending is None:
+                    self.schedule(delay)
+                self.pending = (event, payload)
+                return None
+
+        return self.listener(event, *payload)
+
+    def flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, None
+            self.unschedule()
+            if pending is not None:
+                self.acquire()
+
+        if pending is not None:
+            self.call(pending)
+
+
+class Coalescer(DeferredListener):
+    """
+    Keep only the latest payload per key, calling the listener once per key on flush.
+    """
+    def __init__(self, listener: Callable, scheduler: Callable[[], Scheduler], key: Callable[..., Any], wait: Optional[float] = None):
+        super().__init__(listener, scheduler)
+        self.key = key
+        self.wait = wait
+        self.pending: Dict[Any, Call] = {}
+
+    def __call__(self, event, *payload):
+        with self.lock:
+            self.pending[self.key(event, *payload)] = (event, payload)
+            if self.wait is not None and self.handle is None:
+                self.schedule(self.wait)
+
+    def flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.unschedule()
+
+        for call in pending.values():
+            self.call(call)
@@ -0,0 +1,101 @@
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def listener_name(listener: Callable) -> str:
+    """
+    Get a readable name for the listener a dispatcher closure wraps.
+    """
+    target = getattr(listener, 'target', listener)
+    if isinstance(target, str):
+        return target
+
+    return getattr(target, '__qualname__', repr(target))
+
+
+class DispatcherMetrics:
+    """
+    Collect dispatch counts and listener latencies for a Dispatcher.
+
+    Each listener keeps a call count, cumulative time and a histogram whose
+    buckets are upper bounds in seconds, plus one overflow bucket. Listeners
+    are keyed by the (event, key) entry of their subscription, so two lambdas
+    or two registrations of one function are measured apart; listeners added
+    without one fall back to their name. Listeners slower than the slow
+    threshold are logged with their event.
+    """
+    buckets: Sequence[float]
+    slowThreshold: Optional[float]
+    dispatches: Dict[Any, int]
+    listeners: Dict[Any, Dict[str, Any]]
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, slow_threshold: Optional[float] = None):
+        self.buckets = tuple(buckets)
+        self.slowThreshold = slow_threshold
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.dispatches: Dict[Any, int] = {}
+        self.listeners: Dict[Any, Dict[str, Any]] = {}
+        self.halted = 0
+        self.stopped = 0
+        self.wildcardMatches = 0
+        self.wildcardTime = 0.0
+
+    def record_dispatch(self, event: Any) -> None:
+        with self.lock:
+            self.dispatches[event] = self.dispatches.get(event, 0) + 1
+
+    def record_listener(self, event: Any, listener: Callable, elapsed: float) -> None:
+        name = listener_name(listener)
+        entry = getattr(listener, 'entry', name)
+
+        with self.lock:
+            if entry not in self.listeners:
+                self.listeners[entry] = {'listener': name, 'calls': 0, 'time': 0.0, 'histogram': [0] * (len(self.buckets) + 1)}
+
+            stats = self.listeners[entry]
+            stats['calls'] += 1
+            stats['time'] += elapsed
+            stats['histogram'][bisect.bisect_left(self.buckets, elapsed)] += 1
+
+        if self.slowThreshold is not None and elapsed >= self.slowThreshold:
+            logger.warning("Slow listener %s took %.6fs handling %s", name, elapsed, event)
+
+    def record_halted(self) -> None:
+        with self.lock:
+            self.halted += 1
+
+    def record_stopped(self) -> None:
+        with self.lock:
+            self.stopped += 1
+
+    def record_wildcard_match(self, elapsed: float) -> None:
+        with self.lock:
+            self.wildcardMatches += 1
+            self.wildcardTime += elapsed
+
+    def get_listener_stats(self, entry: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get the stats of a listener by the (event, key) entry of its subscription.
+        """
+        return self.listeners.get(entry)
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'dispatches': dict(self.dispatches),
+                'listeners': {entry: dict(stats, histogram=list(stats['histogram'])) for entry, stats in self.listeners.items()},
+                'halted': self.halted,
+                'stopped': self.stopped,
+                'wildcard_matches': self.wildcardMatches,
+                'wildcard_time': self.wildcardTime,
+                'buckets': list(self.buckets),
+            }
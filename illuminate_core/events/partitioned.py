@@ -0,0 +1,126 @@
+import logging
+import multiprocessing
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from .queued import ListenerQueue
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPartition:
+    """
+    A partition served by a forked worker process running its own copy of the dispatcher.
+    """
+    def __init__(self, dispatcher: Any, max_size: int):
+        context = multiprocessing.get_context('fork')
+        self.queue = context.JoinableQueue(max_size)
+        self.processed = context.Value('l', 0)
+        self.lock = threading.Lock()
+        self.enqueued = 0
+        self.process = context.Process(target=self.work, args=(dispatcher,), daemon=True)
+        self.process.start()
+
+    def work(self, dispatcher: Any) -> None:
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                event, payload = job
+                dispatcher.dispatch(event, *payload)
+            except Exception:
+                logger.exception("Partitioned listener failed")
+            finally:
+                with self.processed.get_lock():
+                    self.processed.value += 1
+                self.queue.task_done()
+
+    def submit(self, event: Any, payload: Tuple[Any, ...]) -> None:
+        self.queue.put((event, payload))
+        with self.lock:
+            self.enqueued += 1
+
+    def drain(self) -> None:
+        self.queue.join()
+
+    def shutdown(self) -> None:
+        self.queue.put(None)
+        self.process.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        try:
+            depth = self.queue.qsize()
+        except NotImplementedError:
+            depth = None
+
+        with self.lock:
+            enqueued = self.enqueued
+
+        return {'enqueued': enqueued, 'processed': self.processed.value, 'dropped': 0, 'depth': depth}
+
+
+class ThreadPartition:
+    """
+    A partition served by a single worker thread, so its events run in order.
+    """
+    def __init__(self, dispatcher: Any, max_size: int):
+        self.dispatcher = dispatcher
+        self.queue = ListenerQueue(workers=1, max_size=max_size)
+
+    def submit(self, event: Any, payload: Tuple[Any, ...]) -> None:
+        self.queue.submit(self.dispatcher.dispatch, event, *payload)
+
+    def drain(self) -> None:
+        self.queue.drain()
+
+    def shutdown(self) -> None:
+        self.queue.shutdown()
+
+    def get_stats(self) -> Dict[str, Any]:
+        metrics = self.queue.get_metrics()
+        return {'enqueued': metrics['enqueued'], 'processed': metrics['processed'], 'dropped': metrics['dropped'], 'depth': metrics['depth']}
+
+
+class Partitioner:
+    """
+    Spread dispatches over partitions chosen by a key function.
+
+    The key function receives the event and its payload; events with equal keys
+    land on the same partition and run in the order they were submitted, while
+    different partitions run in parallel. Process partitions fork the current
+    dispatcher, so only the payloads have to be picklable, and the listeners
+    registered afterwards would never reach them; the dispatcher refuses new
+    listeners while process partitions are running.
+    """
+    key: Callable[..., Any]
+    partitions: List[Any]
+    processes: bool
+
+    def __init__(self, dispatcher: Any, key: Callable[..., Any], partitions: int = 4, processes: bool = False, max_size: int = 1024):
+        partition = ProcessPartition if processes else ThreadPartition
+        self.key = key
+        self.processes = processes
+        self.partitions = [partition(dispatcher, max_size) for _ in range(partitions)]
+
+    def get_partition(self, event: Any, payload: Tuple[Any, ...]) -> int:
+        return hash(self.key(event, *payload)) % len(self.partitions)
+
+    def submit(self, event: Any, payload: Tuple[Any, ...]) -> int:
+        index = self.get_partition(event, payload)
+        self.partitions[index].submit(event, payload)
+        return index
+
+    def join(self) -> None:
+        """
+        Block until every partition has handled everything submitted so far.
+        """
+        for partition in self.partitions:
+            partition.drain()
+
+    def shutdown(self) -> None:
+        for partition in self.partitions:
+            partition.shutdown()
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        return [partition.get_stats() for partition in self.partitions]
@@ -0,0 +1,157 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Job = Tuple[float, Callable, Tuple[Any, ...]]
+
+
+class ListenerQueue:
+    """
+    Run queued listeners on a bounded pool of background workers.
+
+    When the queue is full the overflow policy decides what happens to a new
+    job: 'block' waits for room, 'drop' discards it and 'inline' runs it in the
+    dispatching thread. With processes=True each worker hands its jobs to a
+    process pool, so the queued callables and their payload must be picklable.
+    """
+    workers: int
+    maxSize: int
+    overflow: str
+    processes: bool
+
+    def __init__(self, workers: int = 4, max_size: int = 1024, overflow: str = 'block', processes: bool = False):
+        if overflow not in ('block', 'drop', 'inline'):
+            raise ValueError("Unknown overflow policy [{0}]".format(overflow))
+
+        self.workers = workers
+        self.maxSize = max_size
+        self.overflow = overflow
+        self.processes = processes
+        self.queue: queue.Queue = queue.Queue(max_size)
+        self.threads: List[threading.Thread] = []
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.closed = False
+        self.counters: Dict[str, int] = {'enqueued': 0, 'processed': 0, 'dropped': 0, 'inline': 0, 'failed': 0}
+        self.lagTotal = 0.0
+        self.lagMax = 0.0
+
+    def submit(self, func: Callable, *args) -> bool:
+        """
+        Queue a call, returning False when it was dropped.
+        """
+        if self.closed:
+            raise RuntimeError("The listener queue has been shut down")
+
+        self.start()
+        job = (time.monotonic(), func, args)
+
+        try:
+            self.queue.put(job, block=self.overflow == 'block')
+        except queue.Full:
+            if self.overflow == 'drop':
+                self.count('dropped')
+                return False
+
+            self.count('inline')
+            self.run(job)
+            return True
+
+        self.count('enqueued')
+        return True
+
+    def start(self) -> None:
+        if len(self.threads) > 0:
+            return
+
+        with self.lock:
+            if len(self.threads) > 0:
+                return
+
+            if self.processes:
+                self.pool = ProcessPoolExecutor(self.workers)
+
+            for index in range(self.workers):
+                thread = threading.Thread(target=self.work, name='listener-queue-{0}'.format(index), daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def work(self) -> None:
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                self.run(job)
+            finally:
+                self.queue.task_done()
+
+    def run(self, job: Job) -> None:
+        queued_at, func, args = job
+        lag = time.monotonic() - queued_at
+
+        try:
+            if self.pool is not None:
+                self.pool.submit(func, *args).result()
+            else:
+                func(*args)
+        except Exception:
+            self.count('failed')
+            logger.exception("Queued listener %r failed", func)
+        finally:
+            with self.lock:
+                self.counters['processed'] += 1
+                self.lagTotal += lag
+                self.lagMax = max(self.lagMax, lag)
+
+    def count(self, counter: str) -> None:
+        with self.lock:
+            self.counters[counter] += 1
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued job has run, returning False on timeout.
+        """
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: self.queue.unfinished_tasks == 0, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting jobs and stop the workers, running what is queued first when waiting.
+        """
+        self.closed = True
+
+        if wait:
+            self.drain()
+
+        for _ in self.threads:
+            try:
+                self.queue.put(None, block=wait)
+            except queue.Full:
+                break
+
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+        if self.pool is not None:
+            self.pool.shutdown(wait)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            metrics = dict(self.counters)
+            processed = self.counters['processed']
+            metrics.update({
+                'depth': self.queue.qsize(),
+                'max_size': self.maxSize,
+                'workers': self.workers,
+                'lag_max': self.lagMax,
+                'lag_average': self.lagTotal / processed if processed > 0 else 0.0,
+            })
+
+        return metrics
@@ -0,0 +1,215 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Clock:
+    """
+    The monotonic wall clock used by the scheduler.
+    """
+    manual: bool = False
+
+    def now(self) -> float:
+        return time.monotonic()
+
+
+class ManualClock(Clock):
+    """
+    A clock that only moves when advanced, running whatever became due, for deterministic tests.
+    """
+    manual: bool = True
+
+    def __init__(self, start: float = 0.0):
+        self.current = start
+        self.schedulers: List['Scheduler'] = []
+
+    def now(self) -> float:
+        return self.current
+
+    def advance(self, seconds: float) -> None:
+        self.current += seconds
+        for scheduler in self.schedulers:
+            scheduler.run_pending()
+
+
+class ScheduledHandle:
+    """
+    A pending call which can be cancelled in constant time.
+    """
+    due: float
+    interval: Optional[float]
+    cancelled: bool = False
+    queued: bool = False
+
+    def __init__(self, scheduler: 'Scheduler', due: float, callback: Callable, args: Tuple[Any, ...], interval: Optional[float] = None):
+        self.scheduler = scheduler
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+
+    def cancel(self) -> None:
+        with self.scheduler.condition:
+            if not self.cancelled:
+                self.cancelled = True
+                if self.queued:
+                    self.scheduler.cancelled += 1
+
+
+class Scheduler:
+    """
+    Run delayed and recurring calls from a single heap.
+
+    Calls are served by one background thread, or by one asyncio task after
+    start_async(); with a ManualClock nothing runs until the clock advances.
+    Cancelling only flags the handle, the heap drops cancelled entries as they
+    surface or when they outnumber the live ones.
+    """
+    clock: Clock
+    heap: List[Tuple[float, int, ScheduledHandle]]
+    cancelled: int = 0
+
+    def __init__(self, clock: Optional[Clock] = None):
+        self.clock = clock if clock is not None else Clock()
+        self.heap: List[Tuple[float, int, ScheduledHandle]] = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.stopped = False
+
+        if isinstance(self.clock, ManualClock):
+            self.clock.schedulers.append(self)
+
+    def call_later(self, delay: float, callback: Callable, *args, interval: Optional[float] = None) -> ScheduledHandle:
+        """
+        Run the callback after the delay, then every interval seconds when one is given.
+        """
+        handle = ScheduledHandle(self, self.clock.now() + delay, callback, args, interval)
+
+        with self.condition:
+            self.push(handle)
+            self.condition.notify()
+
+        self.start()
+
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+        return handle
+
+    def push(self, handle: ScheduledHandle) -> None:
+        handle.queued = True
+        heapq.heappush(self.heap, (handle.due, next(self.counter), handle))
+
+    def start(self) -> None:
+        if self.thread is not None or self.loop is not None or self.clock.manual:
+            return
+
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.work, name='event-scheduler', daemon=True)
+                self.thread.start()
+
+    def pop_due(self) -> Optional[ScheduledHandle]:
+        with self.condition:
+            while len(self.heap) > 0 and self.heap[0][2].cancelled:
+                heapq.heappop(self.heap)[2].queued = False
+                self.cancelled -= 1
+
+            if len(self.heap) == 0 or self.heap[0][0] > self.clock.now():
+                return None
+
+            handle = heapq.heappop(self.heap)[2]
+            handle.queued = False
+
+            return handle
+
+    def run_pending(self) -> int:
+        """
+        Run every call that is due, returning how many ran.
+        """
+        count = 0
+        handle = self.pop_due()
+
+        while handle is not None:
+            try:
+                handle.callback(*handle.args)
+            except Exception:
+                logger.exception("Scheduled call %r failed", handle.callback)
+            count += 1
+
+            if handle.interval is not None and not handle.cancelled:
+                handle.due += handle.interval
+                with self.condition:
+                    self.push(handle)
+
+            handle = self.pop_due()
+
+        self.compact()
+
+        return count
+
+    def compact(self) -> None:
+        with self.condition:
+            if self.cancelled > len(self.heap) // 2:
+                for entry in self.heap:
+                    if entry[2].cancelled:
+                        entry[2].queued = False
+                self.heap = [entry for entry in self.heap if not entry[2].cancelled]
+                heapq.heapify(self.heap)
+                self.cancelled = 0
+
+    def next_delay(self) -> Optional[float]:
+        with self.condition:
+            if len(self.heap) == 0:
+                return None
+            return max(self.heap[0][0] - self.clock.now(), 0)
+
+    def work(self) -> None:
+        while not self.stopped:
+            self.run_pending()
+            with self.condition:
+                if self.stopped:
+                    return
+                self.condition.wait(self.next_delay())
+
+    def start_async(self) -> 'asyncio.Future':
+        """
+        Serve the calls from a task on the running event loop instead of a thread.
+        """
+        self.loop = asyncio.get_event_loop()
+        self.wakeup = asyncio.Event()
+
+        async def work():
+            while not self.stopped:
+                self.run_pending()
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.next_delay())
+                except asyncio.TimeoutError:
+                    pass
+
+        return asyncio.ensure_future(work())
+
+    def stop(self) -> None:
+        self.stopped = True
+
+        with self.condition:
+            self.condition.notify_all()
+
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+        if self.thread is not None:
+            self.thread.join()
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
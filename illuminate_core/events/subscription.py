@@ -0,0 +1,28 @@
+from typing import Any, List, Tuple
+
+
+class Subscription:
+    """
+    A handle on the listener registered by Dispatcher.listen.
+
+    Listeners are stored in insertion-ordered dicts keyed by registration, so
+    unsubscribing removes exactly this listener in constant time without
+    copying the remaining ones.
+    """
+    entries: List[Tuple[Any, int]]
+    active: bool = True
+
+    def __init__(self, dispatcher: Any, entries: List[Tuple[Any, int]]):
+        self.dispatcher = dispatcher
+        self.entries = entries
+
+    def unsubscribe(self) -> None:
+        if not self.active:
+            return
+
+        self.active = False
+        for event, key in self.entries:
+            self.dispatcher.remove_listener(event, key)
+
+    def __call__(self, *args) -> None:
+        self.unsubscribe()
@@ -29,3 +29,810 @@ def test_function_listener_with_payload():
     dispatcher.listen('foo', listener)
     dispatcher.dispatch('foo', 2)
     assert a[0] == 3
+
+
+def test_wildcard_listener():
+    received = []
+
+    def listener(event, payload):
+        received.append((event, payload))
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('orders.*.created', listener)
+    dispatcher.dispatch('orders.eu.created', 1)
+    dispatcher.dispatch('orders.eu.updated', 2)
+    dispatcher.dispatch('users.created', 3)
+    assert received == [('orders.eu.created', (1,))]
+
+    dispatcher.forget('orders.*.created')
+    dispatcher.dispatch('orders.eu.created', 4)
+    assert len(received) == 1
+
+
+def test_wildcard_matcher():
+    from .wildcard import WildcardMatcher
+
+    matcher = WildcardMatcher()
+    matcher.add('orders.*')
+    matcher.add('*.created')
+    matcher.add('orders.*.created')
+    matcher.add('users.*')
+
+    assert matcher.match('orders.eu.created') == ['orders.*', '*.created', 'orders.*.created']
+    assert matcher.match('orders') == []
+    assert matcher.match('users.deleted') == ['users.*']
+
+    matcher.remove('orders.*')
+    assert matcher.match('orders.eu.created') == ['*.created', 'orders.*.created']
+
+    matcher.add('order*.created')
+    assert matcher.match('orders.eu.vip.created') == ['*.created', 'orders.*.created', 'order*.created']
+    assert matcher.match('orders.created') == ['*.created', 'order*.created']
+
+    for pattern in ['*.created', 'orders.*.created', 'order*.created', 'users.*']:
+        matcher.remove(pattern)
+    assert len(matcher) == 0
+    assert matcher.trie.is_empty()
+
+
+def test_wildcard_cache_evicts_least_recently_used():
+    dispatcher = Dispatcher()
+    dispatcher.wildcardsCacheSize = 2
+    dispatcher.listen('orders.*', lambda event: event)
+
+    for event in ['orders.a', 'orders.b', 'orders.a', 'orders.c']:
+        assert len(dispatcher.get_wildcard_listeners(event)) == 1
+    assert list(dispatcher.wildcardsCache) == ['orders.a', 'orders.c']
+
+
+def test_listener_cache_invalidated_on_listen():
+    calls = []
+    dispatcher = Dispatcher()
+    dispatcher.listen('foo', lambda: calls.append(1))
+    dispatcher.dispatch('foo')
+
+    listeners = dispatcher.get_listeners('foo')
+    assert dispatcher.get_listeners('foo') is listeners
+
+    dispatcher.listen('foo', lambda: calls.append(2))
+    dispatcher.dispatch('foo')
+    assert calls == [1, 1, 2]
+
+    dispatcher.forget('foo')
+    assert dispatcher.get_listeners('foo') == ()
+
+
+def test_class_event_listeners_follow_mro():
+    received = []
+
+    class Auditable:
+        pass
+
+    class Event:
+        pass
+
+    class OrderEvent(Event):
+        pass
+
+    class OrderCreated(OrderEvent, Auditable):
+        pass
+
+    dispatcher = Dispatcher()
+    dispatcher.listen(OrderCreated, lambda event: received.append('created'))
+    dispatcher.listen(Event, lambda event: received.append('event'))
+    dispatcher.listen(Auditable, lambda event: received.append('auditable'))
+    dispatcher.dispatch(OrderCreated())
+    dispatcher.dispatch(OrderEvent())
+
+    assert received == ['created', 'event', 'auditable', 'event']
+
+
+def test_class_listener_lifetimes():
+    created = []
+
+    class Listener:
+        def __init__(self):
+            created.append(self)
+
+        def handle(self, value):
+            return value
+
+        def audit(self, value):
+            return -value
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('transient', Listener)
+    dispatcher.listen('singleton', Listener, lifetime='singleton')
+    dispatcher.listen('scoped', Listener, lifetime='scoped')
+    dispatcher.container.bind('listener', Listener)
+    dispatcher.listen('method', 'listener@audit', lifetime='singleton')
+
+    for _ in range(3):
+        assert dispatcher.dispatch('transient', 1) == [1]
+        assert dispatcher.dispatch('singleton', 1) == [1]
+    assert len(created) == 4
+
+    with dispatcher.scope():
+        dispatcher.dispatch('scoped', 1)
+        dispatcher.dispatch('scoped', 1)
+    assert len(created) == 5
+
+    assert dispatcher.dispatch('method', 2) == [-2]
+    assert dispatcher.dispatch('method', 3) == [-3]
+    assert len(created) == 6
+
+
+def test_scopes_are_isolated_between_tasks():
+    import asyncio
+
+    class Listener:
+        def handle(self):
+            return self
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('scoped', Listener, lifetime='scoped')
+
+    async def handle():
+        with dispatcher.scope():
+            first = dispatcher.dispatch('scoped')[0]
+            await asyncio.sleep(0)
+            assert dispatcher.dispatch('scoped')[0] is first
+            return first
+
+    async def both():
+        return await asyncio.gather(handle(), handle())
+
+    loop = asyncio.new_event_loop()
+    first, second = loop.run_until_complete(both())
+    loop.close()
+
+    assert first is not second
+    assert dispatcher.scopedListeners.get() is None
+
+
+def test_dispatch_async():
+    import asyncio
+    import threading
+
+    received = []
+
+    async def first(value):
+        await asyncio.sleep(0)
+        received.append(('first', value))
+        return 1
+
+    def second(value):
+        received.append(('second', threading.current_thread() is threading.main_thread()))
+        return False
+
+    def third(value):
+        received.append(('third', value))
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('foo', first)
+    dispatcher.listen('foo', second)
+    dispatcher.listen('foo', third)
+
+    loop = asyncio.new_event_loop()
+    assert loop.run_until_complete(dispatcher.dispatch_async('foo', 2)) == [1]
+    assert received == [('first', 2), ('second', True)]
+
+    received.clear()
+    responses = loop.run_until_complete(dispatcher.dispatch_async('foo', 3, concurrent=True, offload=True))
+    loop.close()
+
+    assert responses == [1, False, None]
+    assert ('second', False) in received
+    assert ('third', 3) in received
+
+
+def test_queued_listener():
+    import threading
+    from .queued import ListenerQueue
+
+    received = []
+    gate = threading.Event()
+
+    def listener(value):
+        gate.wait(1)
+        received.append(value)
+
+    dispatcher = Dispatcher()
+    dispatcher.listenerQueue = ListenerQueue(workers=1, max_size=1, overflow='drop')
+    dispatcher.listen('foo', listener, queued=True)
+
+    assert dispatcher.dispatch('foo', 1) == [None]
+    dispatcher.dispatch('foo', 2)
+    dispatcher.dispatch('foo', 3)
+    gate.set()
+    assert dispatcher.listenerQueue.drain(1)
+
+    metrics = dispatcher.listenerQueue.get_metrics()
+    assert metrics['processed'] == len(received)
+    assert metrics['processed'] + metrics['dropped'] == 3
+    assert metrics['depth'] == 0
+
+    dispatcher.listenerQueue.shutdown()
+    assert received[0] == 1
+
+
+def test_push_and_flush():
+    received = []
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('foo', lambda a, b: received.append(a + b))
+    dispatcher.push('foo', [1, 2])
+    dispatcher.push('foo', [3, 4])
+    dispatcher.push('foo', [1, 2], coalesce=True)
+    dispatcher.push('bar', 5)
+    assert received == []
+
+    dispatcher.flush('foo')
+    assert received == [3, 7]
+    assert dispatcher.get_listeners('foo__pushed') == ()
+
+    dispatcher.flush('foo')
+    assert received == [3, 7]
+
+
+def test_dispatch_many():
+    received = []
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('foo', lambda value: received.append(value) or value)
+    assert dispatcher.dispatch_many('foo', [1, [2], (3,)]) == [[1], [2], [3]]
+    assert received == [1, 2, 3]
+
+
+def test_dispatch_lazy_skips_factory_without_listeners():
+    built = []
+
+    def factory():
+        built.append(1)
+        return ['payload']
+
+    dispatcher = Dispatcher()
+    assert not dispatcher.has_listeners('orders.created')
+    assert dispatcher.dispatch_lazy('orders.created', factory) == []
+    assert built == []
+
+    dispatcher.listen('orders.*', lambda event, payload: payload)
+    assert dispatcher.has_listeners('orders.created')
+    assert dispatcher.dispatch_lazy('orders.created', factory) == [('payload',)]
+    assert built == [1]
+
+
+def test_metrics():
+    def first(value):
+        return value
+
+    def second(value):
+        return False
+
+    dispatcher = Dispatcher()
+    subscription = dispatcher.listen('foo', first)
+    dispatcher.listen('foo', second)
+    dispatcher.listen('bar.*', lambda event, payload: None)
+    dispatcher.listen('bar.*', lambda event, payload: None)
+    metrics = dispatcher.enable_metrics(slow_threshold=10)
+
+    dispatcher.dispatch('foo', 1)
+    dispatcher.dispatch('foo', 2)
+    dispatcher.until('foo', 3)
+    dispatcher.dispatch('bar.baz')
+
+    summary = metrics.summary()
+    assert summary['dispatches'] == {'foo': 3, 'bar.baz': 1}
+    assert summary['stopped'] == 2
+    assert summary['halted'] == 1
+    assert summary['wildcard_matches'] == 2
+    stats = metrics.get_listener_stats(subscription.entries[0])
+    assert stats['listener'] == first.__qualname__
+    assert stats['calls'] == 3
+    assert sum(stats['histogram']) == 3
+    lambdas = [stats for stats in summary['listeners'].values() if stats['listener'].endswith('<lambda>')]
+    assert [stats['calls'] for stats in lambdas] == [1, 1]
+
+    dispatcher.disable_metrics()
+    dispatcher.dispatch('foo', 4)
+    assert metrics.summary()['dispatches']['foo'] == 3
+
+
+def test_partitioned_dispatch_keeps_order_per_key():
+    received = {}
+
+    def listener(order, step):
+        received.setdefault(order, []).append(step)
+
+    dispatcher = Dispatcher()
+    dispatcher.listen('order.updated', listener)
+    partitioner = dispatcher.partition(lambda event, order, step: order, partitions=3)
+
+    for step in range(20):
+        for order in ('a', 'b', 'c', 'd'):
+            dispatcher.dispatch_partitioned('order.updated', order, step)
+    partitioner.join()
+
+    assert received == {order: list(range(20)) for order in ('a', 'b', 'c', 'd')}
+    assert sum(stats['processed'] for stats in partitioner.get_stats()) == 80
+    assert sum(stats['dropped'] for stats in partitioner.get_stats()) == 0
+
+    replacement = dispatcher.partition(lambda event, order, step: order, partitions=2)
+    assert all(partition.queue.closed for partition in partitioner.partitions)
+    replacement.shutdown()
+
+
+def test_process_partitions_refuse_later_listeners():
+    dispatcher = Dispatcher()
+    dispatcher.listen('order.updated', lambda order: None)
+    dispatcher.partition(lambda event, order: order, partitions=1, processes=True)
+
+    try:
+        dispatcher.listen('order.created', lambda order: None)
+        assert False
+    except RuntimeError:
+        pass
+
+    dispatcher.dispatch_partitioned('order.updated', 'a')
+    dispatcher.partitioner.join()
+    assert dispatcher.partitioner.get_stats()[0]['enqueued'] == 1
+    dispatcher.shutdown()
+    dispatcher.listen('order.created', lambda order: None)
+
+
+def test_publish_over_loopback_transport():
+    from .transport import LoopbackTransport
+
+    received = []
+    local, remote = LoopbackTransport.pair()
+
+    publisher = Dispatcher()
+    subscriber = Dispatcher()
+    subscriber.listen('cache.cleared', lambda key: received.append(key))
+    subscriber.listen('user.login', lambda key: received.append(key))
+    bus = publisher.publish('cache.*', local)
+    subscriber.receive_from(remote)
+
+    for key in ('a', 'b', 'c'):
+        publisher.dispatch('cache.cleared', key)
+    publisher.dispatch('user.login', 'd')
+    bus.flush()
+
+    assert received == ['a', 'b', 'c']
+    assert bus.get_stats()['published'] == 3
+    bus.close()
+
+
+def publish_through_loopback(dispatch):
+    from .transport import LoopbackTransport
+
+    received = []
+    local, remote = LoopbackTransport.pair()
+
+    publisher = Dispatcher()
+    subscriber = Dispatcher()
+    subscriber.listen('cache.cleared', lambda key: received.append(key))
+    bus = publisher.publish('cache.cleared', local)
+    subscriber.receive_from(remote)
+
+    dispatch(publisher)
+    bus.flush()
+    bus.close()
+
+    return received
+
+
+def test_fire_publishes_to_buses():
+    assert publish_through_loopback(lambda dispatcher: dispatcher.fire('cache.cleared', 'a')) == ['a']
+
+
+def test_dispatch_lazy_publishes_to_buses():
+    assert publish_through_loopback(lambda dispatcher: dispatcher.dispatch_lazy('cache.cleared', lambda: 'a')) == ['a']
+
+
+def test_dispatch_async_publishes_to_buses():
+    import asyncio
+
+    def dispatch(dispatcher):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(dispatcher.dispatch_async('cache.cleared', 'a'))
+        loop.close()
+
+    assert publish_through_loopback(dispatch) == ['a']
+
+
+def test_publish_over_pipe_transport():
+    import threading
+    from .transport import ConnectionTransport
+
+    received = []
+    done = threading.Event()
+    local, remote = ConnectionTransport.pipe()
+
+    subscriber = Dispatcher()
+    subscriber.listen('cache.cleared', lambda key: received.append(key) or (len(received) == 2 and done.set()))
+    subscriber.receive_from(remote)
+
+    publisher = Dispatcher()
+    publisher.publish(['cache.cleared'], local)
+    publisher.dispatch('cache.cleared', 'a')
+    publisher.dispatch('cache.cleared', 'b')
+
+    assert done.wait(5)
+    assert received == ['a', 'b']
+
+
+def test_journal_replay():
+    import tempfile
+    import threading
+    from .journal import EventJournal
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = EventJournal(directory, segment_size=256, index_interval=64)
+        dispatcher = Dispatcher()
+        dispatcher.journal(['orders.*', 'users.login'], journal)
+
+        for number in range(10):
+            dispatcher.dispatch('orders.created', number, 'x' * number)
+        dispatcher.dispatch('users.login', 'alice')
+        dispatcher.dispatch('users.logout', 'alice')
+        journal.close()
+
+        journal = EventJournal(directory, segment_size=256)
+        assert len(journal.segments) > 1
+
+        records = list(journal.read())
+        assert [record[2] for record in records] == ['orders.created'] * 10 + ['users.login']
+        assert records[3][3] == (3, 'xxx')
+
+        received = []
+
+        def audit(number, padding):
+            received.append(number)
+            if number == 4:
+                thread = threading.Thread(target=auditor.dispatch, args=('users.login', 'bob'))
+                thread.start()
+                thread.join()
+
+        replayer = Dispatcher()
+        replayer.listen('orders.created', audit)
+        replayer.journal('orders.*', journal)
+        auditor = Dispatcher()
+        auditor.journal('users.login', journal)
+        offsets = list(journal.replay(replayer, records[4][0]))
+        assert received == [4, 5, 6, 7, 8, 9]
+        assert offsets[:7] == [record[0] for record in records[4:]]
+
+        since = [record[0] for record in journal.read(since=records[7][1])]
+        assert since[0] <= records[7][0]
+        assert [record[3] for record in journal.read()][11:] == [('bob',)]
+        journal.close()
+
+
+def test_journal_maps_only_the_active_segment_and_survives_clock_steps():
+    import tempfile
+    from .journal import EventJournal
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = EventJournal(directory, segment_size=128, sync='never', index_interval=1)
+        for number, timestamp in enumerate([10.0, 20.0, 15.0, 30.0, 25.0, 40.0]):
+            journal.append('tick', (number, 'x' * 40), timestamp)
+
+        assert len(journal.segments) > 2
+        assert all(segment.map is None for segment in journal.segments[:-1])
+        assert journal.segments[-1].map is not None
+
+        assert [record[3][0] for record in journal.read(since=20.0)] == [1, 3, 4, 5]
+        assert [record[3][0] for record in journal.read(since=26.0)] == [3, 5]
+        journal.close()
+
+
+def test_dispatch_later_with_manual_clock():
+    from .scheduler import ManualClock
+
+    received = []
+    clock = ManualClock()
+    dispatcher = Dispatcher()
+    dispatcher.use_clock(clock)
+    dispatcher.listen('retry', lambda attempt: received.append(('retry', attempt)))
+    dispatcher.listen('tick', lambda: received.append('tick'))
+
+    dispatcher.dispatch_later('retry', 1, delay=5)
+    cancelled = dispatcher.dispatch_later('retry', 2, delay=1)
+    ticker = dispatcher.schedule('tick', interval=2)
+    cancelled.cancel()
+
+    clock.advance(4)
+    assert received == ['tick', 'tick']
+
+    clock.advance(1)
+    assert received == ['tick', 'tick', ('retry', 1)]
+
+    ticker.cancel()
+    clock.advance(10)
+    assert received == ['tick', 'tick', ('retry', 1)]
+    assert len(dispatcher.scheduler) == 0
+
+
+def test_dispatch_later_with_thread():
+    import threading
+
+    done = threading.Event()
+    dispatcher = Dispatcher()
+    dispatcher.listen('foo', lambda: done.set())
+    dispatcher.dispatch_later('foo', delay=0.01)
+
+    assert done.wait(2)
+    dispatcher.scheduler.stop()
+
+
+def test_listener_timeout_and_circuit_breaker():
+    import threading
+    from .breaker import CircuitBreaker
+    from .scheduler import ManualClock
+
+    release = threading.Event()
+    calls = []
+
+    def hanging():
+        calls.append('hanging')
+        release.wait(5)
+
+    clock = ManualClock()
+    dispatcher = Dispatcher()
+    subscription = dispatcher.listen('foo', hanging, timeout=0.01, breaker=CircuitBreaker(failures=2, reset_timeout=10, clock=clock))
+    dispatcher.listen('foo', lambda: 'fast', breaker=True)
+    dispatcher.listen('bar', lambda: 'fast', breaker=True)
+    assert len(dispatcher.get_breaker_states()) == 3
+
+    assert dispatcher.dispatch('foo') == [None, 'fast']
+    assert dispatcher.dispatch('foo') == [None, 'fast']
+    assert dispatcher.dispatch('foo') == [None, 'fast']
+    assert calls == ['hanging', 'hanging']
+
+    state = dispatcher.get_breaker_states()[subscription.entries[0]]
+    assert state['state'] == 'open'
+    assert state['timeouts'] == 2
+    assert state['skipped'] == 1
+
+    release.set()
+    clock.advance(10)
+    assert dispatcher.dispatch('foo') == [None, 'fast']
+    assert dispatcher.get_breaker_states()[subscription.entries[0]]['state'] == 'closed'
+
+
+def test_timeout_saturation_and_listener_timeout_errors():
+    import threading
+    from .breaker import CircuitBreaker
+
+    release = threading.Event()
+
+    def hanging():
+        release.wait(5)
+
+    def failing():
+        raise TimeoutError('from the listener')
+
+    dispatcher = Dispatcher()
+    dispatcher.timeoutWorkers = 1
+    dispatcher.listen('slow', hanging, timeout=0.01)
+    breaker = CircuitBreaker(failures=1)
+    dispatcher.listen('fast', lambda: 'fast', timeout=1, breaker=breaker)
+    dispatcher.listen('failing', failing, timeout=1)
+
+    assert dispatcher.dispatch('slow') == [None]
+    assert dispatcher.dispatch('fast') == [None]
+    assert breaker.get_state()['state'] == 'closed'
+    assert dispatcher.get_timeout_stats() == {'timeouts': 1, 'saturated': 1}
+
+    release.set()
+    dispatcher.timeoutExecutor.shutdown(True)
+    dispatcher.timeoutExecutor = None
+    assert dispatcher.dispatch('fast') == ['fast']
+
+    try:
+        dispatcher.dispatch('failing')
+        assert False
+    except TimeoutError as e:
+        assert str(e) == 'from the listener'
+
+
+def test_subscription_handles():
+    received = []
+    dispatcher = Dispatcher()
+    first = dispatcher.listen(['foo', 'bar.*'], lambda *args: received.append('first'))
+    dispatcher.listen('foo', lambda: received.append('second'))
+
+    dispatcher.dispatch('foo')
+    first.unsubscribe()
+    dispatcher.dispatch('foo')
+    dispatcher.dispatch('bar.baz')
+
+    assert received == ['first', 'second', 'second']
+    assert not dispatcher.has_listeners('bar.baz')
+
+
+def test_deferred_listener_failures_are_reported():
+    from .limiter import DeferredListener
+    from .scheduler import ManualClock
+
+    received = []
+
+    def listener(key, value):
+        if key == 'bad':
+            raise RuntimeError(key)
+        received.append(key)
+
+    clock = ManualClock()
+    dispatcher = Dispatcher()
+    dispatcher.use_clock(clock)
+    dispatcher.listen('model.updated', listener, coalesce=lambda event, key, value: key, coalesce_wait=1)
+    dispatcher.dispatch('model.updated', 'bad', 1)
+    dispatcher.dispatch('model.updated', 'good', 2)
+    clock.advance(1)
+    dispatcher.flush_deferred()
+    assert received == ['good']
+
+    try:
+        DeferredListener(listener, dispatcher.get_scheduler)
+        assert False
+    except TypeError:
+        pass
+    dispatcher.shutdown()
+
+
+def test_weak_listener_unsubscribes_when_collected():
+    import gc
+
+    received = []
+
+    class Session:
+        def on_message(self, message):
+            received.append(message)
+
+    session = Session()
+    dispatcher = Dispatcher()
+    dispatcher.listen('message', session.on_message, weak=True)
+    dispatcher.dispatch('message', 'hello')
+
+    del session
+    gc.collect()
+
+    assert not dispatcher.has_listeners('message')
+    dispatcher.dispatch('message', 'bye')
+    assert received == ['hello']
+
+
+def test_weak_listeners_can_be_queued_but_have_no_lifetime():
+    import gc
+
+    received = []
+
+    class Session:
+        def on_message(self, message):
+            received.append(message)
+
+    session = Session()
+    dispatcher = Dispatcher()
+    dispatcher.listen('message', session.on_message, weak=True, queued=True)
+    assert dispatcher.dispatch('message', 'hello') == [None]
+    dispatcher.listenerQueue.drain()
+    assert received == ['hello']
+
+    del session
+    gc.collect()
+    assert not dispatcher.has_listeners('message')
+
+    try:
+        dispatcher.listen('message', Session().on_message, weak=True, lifetime='singleton')
+        assert False
+    except ValueError:
+        pass
+    dispatcher.shutdown()
+
+
+def test_debounce_throttle_and_coalesce():
+    from .scheduler import ManualClock
+
+    received = []
+    clock = ManualClock()
+    dispatcher = Dispatcher()
+    dispatcher.use_clock(clock)
+    dispatcher.listen('import.row', lambda row: received.append(('debounced', row)), debounce=1)
+    dispatcher.listen('import.row', lambda row: received.append(('throttled', row)), throttle=(2, 10))
+    dispatcher.listen('model.updated', lambda key, value: received.append((key, value)), coalesce=lambda event, key, value: key)
+
+    for row in range(5):
+        dispatcher.dispatch('import.row', row)
+        clock.advance(0.5)
+    assert received == [('throttled', 0), ('throttled', 1)]
+
+    clock.advance(1)
+    assert received[-1] == ('debounced', 4)
+
+    clock.advance(10)
+    assert received[-1] == ('throttled', 4)
+
+    dispatcher.dispatch('model.updated', 'a', 1)
+    dispatcher.dispatch('model.updated', 'b', 1)
+    dispatcher.dispatch('model.updated', 'a', 2)
+    dispatcher.flush_deferred()
+    assert received[-2:] == [('a', 2), ('b', 1)]
+
+    dispatcher.shutdown()
+
+
+def test_forget_drops_held_back_calls():
+    from .scheduler import ManualClock
+
+    received = []
+    clock = ManualClock()
+    dispatcher = Dispatcher()
+    dispatcher.use_clock(clock)
+    dispatcher.listen('x', received.append, debounce=1)
+
+    dispatcher.dispatch('x', 1)
+    dispatcher.forget('x')
+    clock.advance(2)
+
+    assert received == []
+    assert dispatcher.deferredListeners == []
+
+    try:
+        dispatcher.listen('x', received.append, debounce=1, throttle=(1, 1))
+        assert False
+    except ValueError:
+        pass
+
+
+def test_socket_transport_requires_the_authkey():
+    import os
+    import tempfile
+    import threading
+    from multiprocessing import AuthenticationError
+    from .transport import ConnectionTransport
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.sock')
+        served = []
+        server = threading.Thread(target=lambda: served.append(ConnectionTransport.serve(path, b'secret')))
+        server.start()
+
+        client = None
+        for _ in range(100):
+            try:
+                client = ConnectionTransport.connect(path, b'secret')
+                break
+            except FileNotFoundError:
+                threading.Event().wait(0.01)
+        server.join(5)
+
+        received = []
+        done = threading.Event()
+        served[0].start(lambda data: received.append(data) or done.set())
+        client.send(b'batch')
+        assert done.wait(5) and received == [b'batch']
+        client.close()
+        served[0].close()
+
+        rejected = []
+
+        def serve():
+            try:
+                ConnectionTransport.serve(path, b'secret')
+            except AuthenticationError:
+                rejected.append(True)
+
+        path = os.path.join(directory, 'other.sock')
+        server = threading.Thread(target=serve)
+        server.start()
+        for _ in range(100):
+            try:
+                ConnectionTransport.connect(path, b'wrong')
+                assert False
+            except FileNotFoundError:
+                threading.Event().wait(0.01)
+            except AuthenticationError:
+                break
+        server.join(5)
+        assert rejected == [True]
@@ -0,0 +1,219 @@
+import logging
+import pickle
+from abc import ABC, abstractmethod
+import queue
+import threading
+from multiprocessing import Pipe
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .wildcard import WildcardMatcher
+
+logger = logging.getLogger(__name__)
+
+Receiver = Callable[[bytes], None]
+Message = Tuple[Any, Tuple[Any, ...]]
+
+
+def encode_batch(batch: List[Message]) -> bytes:
+    return pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+
+
+def decode_batch(data: bytes) -> List[Message]:
+    return pickle.loads(data)
+
+
+class Transport(ABC):
+    """
+    Carry encoded event batches between dispatchers. Batches are pickled, so
+    only connect processes that trust each other.
+    """
+    @abstractmethod
+    def send(self, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def start(self, receive: Receiver) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LoopbackTransport(Transport):
+    """
+    An in-process transport delivering batches to its peer synchronously, for tests.
+    """
+    peer: Optional['LoopbackTransport']
+    receiver: Optional[Receiver]
+
+    def __init__(self):
+        self.peer = None
+        self.receiver = None
+
+    @classmethod
+    def pair(cls) -> Tuple['LoopbackTransport', 'LoopbackTransport']:
+        left, right = cls(), cls()
+        left.peer, right.peer = right, left
+        return left, right
+
+    def send(self, data: bytes) -> None:
+        if self.peer is not None and self.peer.receiver is not None:
+            self.peer.receiver(data)
+
+    def start(self, receive: Receiver) -> None:
+        self.receiver = receive
+
+    def close(self) -> None:
+        self.receiver = None
+
+
+class ConnectionTransport(Transport):
+    """
+    A transport over a multiprocessing connection: a Pipe end or a Unix socket.
+
+    Socket peers must prove they know the shared authkey before anything is
+    unpickled from them.
+    """
+    connection: Connection
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def pipe(cls) -> Tuple['ConnectionTransport', 'ConnectionTransport']:
+        left, right = Pipe()
+        return cls(left), cls(right)
+
+    @classmethod
+    def serve(cls, path: str, authkey: bytes) -> 'ConnectionTransport':
+        """
+        Wait for a single peer to connect on the given Unix socket path.
+
+        The socket stops listening once that peer is accepted; serve again
+        on another path for every further peer.
+        """
+        if not authkey:
+            raise ValueError("An authkey is required to accept event batches over a socket")
+
+        with Listener(path, 'AF_UNIX', authkey=authkey) as listener:
+            return cls(listener.accept())
+
+    @classmethod
+    def connect(cls, path: str, authkey: bytes) -> 'ConnectionTransport':
+        if not authkey:
+            raise ValueError("An authkey is required to send event batches over a socket")
+
+        return cls(Client(path, 'AF_UNIX', authkey=authkey))
+
+    def send(self, data: bytes) -> None:
+        with self.lock:
+            self.connection.send_bytes(data)
+
+    def start(self, receive: Receiver) -> None:
+        def work():
+            while True:
+                try:
+                    data = self.connection.recv_bytes()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    receive(data)
+                except Exception:
+                    logger.exception("Failed to dispatch a received event batch")
+
+        self.thread = threading.Thread(target=work, name='event-transport', daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class EventBus:
+    """
+    Publish selected events to a peer through a transport.
+
+    Published events wait in a bounded queue; a sender thread takes everything
+    that is queued, up to batch_size events, and sends it as one batch. When a
+    slow peer lets the queue fill up, publish() blocks until there is room.
+    """
+    transport: Transport
+    events: List[Any]
+    batchSize: int
+
+    def __init__(self, transport: Transport, events: List[Any], batch_size: int = 256, max_pending: int = 8192):
+        self.transport = transport
+        self.events = list(events)
+        self.batchSize = batch_size
+        self.matcher = WildcardMatcher()
+        self.exact = set()
+        self.matches: Dict[Any, bool] = {}
+        self.queue: queue.Queue = queue.Queue(max_pending)
+        self.counters: Dict[str, int] = {'published': 0, 'batches': 0, 'failed': 0}
+
+        for event in self.events:
+            if isinstance(event, str) and '*' in event:
+                self.matcher.add(event)
+            else:
+                self.exact.add(event)
+
+        self.thread = threading.Thread(target=self.work, name='event-bus', daemon=True)
+        self.thread.start()
+
+    def should_publish(self, event: Any) -> bool:
+        if event not in self.matches:
+            self.matches[event] = event in self.exact or (isinstance(event, str) and len(self.matcher.match(event)) > 0)
+
+        return self.matches[event]
+
+    def publish(self, event: Any, payload: Tuple[Any, ...]) -> None:
+        self.queue.put((event, payload))
+
+    def work(self) -> None:
+        while True:
+            message = self.queue.get()
+            if message is None:
+                self.queue.task_done()
+                return
+
+            batch = [message]
+            while len(batch) < self.batchSize:
+                try:
+                    message = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    self.queue.put(None)
+                    self.queue.task_done()
+                    break
+                batch.append(message)
+
+            try:
+                self.transport.send(encode_batch(batch))
+                self.counters['published'] += len(batch)
+                self.counters['batches'] += 1
+            except Exception:
+                self.counters['failed'] += len(batch)
+                logger.exception("Failed to publish an event batch")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything published so far has been handed to the transport.
+        """
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: self.queue.unfinished_tasks == 0, timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        self.transport.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.counters, pending=self.queue.qsize())
@@ -0,0 +1,137 @@
+import re
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+
+class WildcardNode:
+    """
+    A node of the segment trie, reached by a literal segment or a ``*`` segment.
+    """
+    children: Dict[str, 'WildcardNode']
+    star: Optional['WildcardNode']
+    patterns: List[str]
+    partial: List[Tuple[str, Pattern]]
+
+    def __init__(self):
+        self.children: Dict[str, 'WildcardNode'] = {}
+        self.star: Optional['WildcardNode'] = None
+        self.patterns: List[str] = []
+        self.partial: List[Tuple[str, Pattern]] = []
+
+    def is_empty(self) -> bool:
+        return len(self.children) == 0 and self.star is None and len(self.patterns) == 0 and len(self.partial) == 0
+
+
+class WildcardMatcher:
+    """
+    Match event names against wildcard patterns.
+
+    A ``*`` matches any run of characters, dots included, so ``orders.*.created``
+    matches ``orders.eu.created`` and ``orders.eu.vip.created``; every other
+    character only matches itself. Patterns are indexed in a trie of their dot
+    separated segments, where a ``*`` segment is an edge consuming one or more
+    segments of the event. A pattern is indexed up to its first segment mixing
+    ``*`` with other characters, such as ``order*``; the rest of it is matched
+    by a regular expression against the rest of the event.
+    """
+    order: Dict[str, int]
+    trie: WildcardNode
+
+    def __init__(self):
+        self.order: Dict[str, int] = {}
+        self.trie = WildcardNode()
+        self.counter = 0
+
+    def add(self, pattern: str) -> None:
+        if pattern in self.order:
+            return
+
+        self.order[pattern] = self.counter
+        self.counter += 1
+
+        node = self.trie
+        segments = pattern.split('.')
+        for index, segment in enumerate(segments):
+            if self.is_partial(segment):
+                rest = '.'.join(segments[index:])
+                node.partial.append((pattern, self.compile(rest)))
+                return
+
+            if self.is_star(segment):
+                if node.star is None:
+                    node.star = WildcardNode()
+                node = node.star
+            else:
+                node = node.children.setdefault(segment, WildcardNode())
+
+        node.patterns.append(pattern)
+
+    def remove(self, pattern: str) -> None:
+        if pattern not in self.order:
+            return
+
+        del self.order[pattern]
+
+        node = self.trie
+        path: List[Tuple[WildcardNode, Optional[str]]] = []
+        for segment in pattern.split('.'):
+            if self.is_partial(segment):
+                node.partial = [entry for entry in node.partial if entry[0] != pattern]
+                break
+
+            key = None if self.is_star(segment) else segment
+            path.append((node, key))
+            node = node.star if key is None else node.children[key]
+        else:
+            node.patterns.remove(pattern)
+
+        while len(path) > 0 and node.is_empty():
+            parent, key = path.pop()
+            if key is None:
+                parent.star = None
+            else:
+                del parent.children[key]
+            node = parent
+
+    def match(self, event: str) -> List[str]:
+        """
+        Get the patterns matching the given event, in registration order.
+        """
+        segments = event.split('.')
+        matches: Set[str] = set()
+        visited: Set[Tuple[int, int]] = set()
+        pending: List[Tuple[WildcardNode, int]] = [(self.trie, 0)]
+
+        while len(pending) > 0:
+            node, index = pending.pop()
+            if (id(node), index) in visited:
+                continue
+            visited.add((id(node), index))
+
+            if index == len(segments):
+                matches.update(node.patterns)
+                continue
+
+            if len(node.partial) > 0:
+                rest = '.'.join(segments[index:])
+                matches.update(pattern for pattern, compiled in node.partial if compiled.fullmatch(rest))
+
+            child = node.children.get(segments[index])
+            if child is not None:
+                pending.append((child, index + 1))
+
+            if node.star is not None:
+                pending.extend((node.star, end) for end in range(index + 1, len(segments) + 1))
+
+        return sorted(matches, key=self.order.__getitem__)
+
+    def is_star(self, segment: str) -> bool:
+        return len(segment) > 0 and segment.strip('*') == ''
+
+    def is_partial(self, segment: str) -> bool:
+        return '*' in segment and not self.is_star(segment)
+
+    def compile(self, pattern: str) -> Pattern:
+        return re.compile('.*'.join(re.escape(part) for part in pattern.split('*')), re.DOTALL)
+
+    def __len__(self):
+        return len(self.order)
@@ -1,5 +1,9 @@
-from typing import Any, Callable, Dict, List, Union, Optional
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Set, Union, Optional
 from illuminate_core.container import Container
+from illuminate_core.container.overlay import ContainerOverlay, TenantOverlays
 from illuminate_core.service import ServiceProvider
 from illuminate_core.container.types import ClassAnnotation, Parameters
 from illuminate_core.support.utils import call_user_func
@@ -7,21 +11,26 @@ from illuminate_core.events import EventServiceProvider
 
 Provider = Union[ServiceProvider, ClassAnnotation]
 DeferredServices = Dict[ClassAnnotation, Union[ServiceProvider, ClassAnnotation]]
+BootGraph = Dict[ServiceProvider, Set[ServiceProvider]]
 
 
 class Kernel(Container):
-    booted: bool = False
+    _booted: bool = False
     serviceProviders: List[ServiceProvider]
     loadedProviders: Dict[str, bool]
     deferredServices: DeferredServices
     bootingCallbacks: List[Callable]
     bootedCallbacks: List[Callable]
     hasBeenBootstrapped: bool = False
+    bootWorkers: int = 1
+    providedServices: Dict[ClassAnnotation, ServiceProvider]
+    tenantOverlays: Optional[TenantOverlays] = None
 
     def __init__(self):
         super().__init__()
 
         self.serviceProviders: List[ServiceProvider] = []
+        self.providedServices: Dict[ClassAnnotation, ServiceProvider] = {}
         self.loadedProviders: Dict[str, bool] = {}
         self.deferredServices: DeferredServices = {}
         self.bootingCallbacks: List[Callable] = []
@@ -43,9 +52,17 @@ class Kernel(Container):
         events = self.make('events')
 
         for bootstrapper in bootstrappers:
-            events.fire('bootstrapping: {0}'.format(bootstrapper), self)
+            self.fire_bootstrap_event(events, 'bootstrapping', bootstrapper)
             self.make(bootstrapper).bootstrap(self)
-            events.fire('bootstrapped: {0}'.format(bootstrapper), self)
+            self.fire_bootstrap_event(events, 'bootstrapped', bootstrapper)
+
+    def fire_bootstrap_event(self, events, stage: str, bootstrapper) -> None:
+        if not events.has_any_listeners():
+            return
+
+        event = '{0}: {1}'.format(stage, bootstrapper)
+        if events.has_listeners(event):
+            events.fire(event, self)
 
     def before_bootstrapping(self, bootstrapper: str, callback: Callable) -> None:
         self['events'].listen('bootstrapping: {0}'.format(bootstrapper), callback)
@@ -67,13 +84,16 @@ class Kernel(Container):
         if not isinstance(provider, ServiceProvider):
             provider = self.resolve_provider(provider)
 
+        existing = set(self.bindings) | set(self.instances)
+
         if hasattr(provider, 'register'):
             method = getattr(provider, 'register')
             call_user_func(method)
 
         self.mark_as_registered(provider)
+        self.mark_as_provided(provider, (set(self.bindings) | set(self.instances)) - existing)
 
-        if self.booted:
+        if self._booted:
             self.boot_provider(provider)
 
         return provider
@@ -94,8 +114,12 @@ class Kernel(Container):
         self.serviceProviders.append(provider)
         self.loadedProviders[provider.__class__.__qualname__] = True
 
+    def mark_as_provided(self, provider: ServiceProvider, services: Set[ClassAnnotation]):
+        for service in list(services) + list(provider.provides()):
+            self.providedServices.setdefault(service, provider)
+
     def load_deferred_providers(self):
-        for service in self.deferredServices.keys():
+        for service in list(self.deferredServices.keys()):
             self.load_deferred_provider(service)
 
         self.deferredServices = {}
@@ -116,41 +140,203 @@ class Kernel(Container):
         instance = provider(self)
         self.register(instance)
 
-        if not self.booted:
+        if not self._booted:
             def closure():
                 self.boot_provider(instance)
             self.booting(closure)
 
     def make(self, abstract: str, parameters: Parameters = None) -> Any:
-        abstract = self.get_alias(abstract)
+        with self._lock:
+            abstract = self.get_alias(abstract)
 
-        if abstract in self.deferredServices and abstract not in self.instances:
-            self.load_deferred_provider(abstract)
+            if abstract in self.deferredServices and abstract not in self.instances:
+                self.load_deferred_provider(abstract)
 
         return super().make(abstract, parameters)
 
     def bound(self, abstract: ClassAnnotation) -> bool:
         return abstract in self.deferredServices or super().bound(abstract)
 
+    def tenants(self, configure: Optional[Callable[[ContainerOverlay], Any]] = None, **options) -> TenantOverlays:
+        """
+        Get the per-tenant overlays of the kernel, each holding only the tenant's overrides.
+
+        Called without arguments it returns the current overlays; with a
+        configure callback or options (max_tenants, max_memory) it disposes
+        of them and starts over with the new settings.
+        """
+        with self._lock:
+            if self.tenantOverlays is None or configure is not None or len(options) > 0:
+                if self.tenantOverlays is not None:
+                    self.tenantOverlays.clear()
+                self.tenantOverlays = TenantOverlays(self, configure, **options)
+
+            return self.tenantOverlays
+
     def is_booted(self) -> bool:
-        return self.booted
+        return self._booted
 
     def boot(self) -> None:
-        if self.booted:
+        if self._booted:
             return
 
         self.fire_app_callbacks(self.bootingCallbacks)
 
-        for provider in self.serviceProviders:
-            self.boot_provider(provider)
+        count = 0
+        while count < len(self.serviceProviders):
+            providers = self.serviceProviders[count:]
+            count = len(self.serviceProviders)
 
-        self.booted = True
+            if self.bootWorkers > 1:
+                self.boot_providers_concurrently(providers)
+            else:
+                for provider in self.sort_boot_graph(self.get_boot_graph(providers)):
+                    self.boot_provider(provider)
+
+        self._booted = True
         self.fire_app_callbacks(self.bootedCallbacks)
 
+    async def boot_async(self) -> None:
+        """
+        Boot the providers on the running event loop, awaiting coroutine boot methods.
+        """
+        if self._booted:
+            return
+
+        self.fire_app_callbacks(self.bootingCallbacks)
+
+        count = 0
+        while count < len(self.serviceProviders):
+            providers = self.serviceProviders[count:]
+            count = len(self.serviceProviders)
+            await self.boot_providers_async(providers)
+
+        self._booted = True
+        self.fire_app_callbacks(self.bootedCallbacks)
+
+    def freeze(self) -> None:
+        """
+        Load the deferred providers and freeze the container before forking workers.
+        """
+        self.load_deferred_providers()
+        super().freeze()
+
     def boot_provider(self, provider: ServiceProvider) -> Any:
         if hasattr(provider, 'boot'):
             return self.call(getattr(provider, 'boot'))
 
+    def boot_provider_blocking(self, provider: ServiceProvider) -> Any:
+        """
+        Boot the given provider, running a coroutine boot method to completion.
+        """
+        result = self.boot_provider(provider)
+
+        if inspect.iscoroutine(result):
+            loop = asyncio.new_event_loop()
+            try:
+                return loop.run_until_complete(result)
+            finally:
+                loop.close()
+
+        return result
+
+    def get_boot_dependencies(self, provider: ServiceProvider) -> List[ServiceProvider]:
+        """
+        Get the registered providers the given provider must be booted after.
+        """
+        dependencies = []
+
+        for dependency in provider.boot_dependencies():
+            if isinstance(dependency, type) and issubclass(dependency, ServiceProvider):
+                dependencies.extend(self.get_providers(dependency))
+            else:
+                dependency = self.get_alias(dependency)
+                if dependency in self.providedServices:
+                    dependencies.append(self.providedServices[dependency])
+
+        return [dependency for dependency in dependencies if dependency is not provider]
+
+    def get_boot_graph(self, providers: List[ServiceProvider]) -> BootGraph:
+        """
+        Map each provider to the providers among the given ones it depends on.
+        """
+        graph: BootGraph = {provider: set() for provider in providers}
+
+        for provider in providers:
+            graph[provider] = {dependency for dependency in self.get_boot_dependencies(provider) if dependency in graph}
+
+        return graph
+
+    def sort_boot_graph(self, graph: BootGraph) -> List[ServiceProvider]:
+        """
+        Order the providers so that every provider follows its dependencies.
+        """
+        pending = {provider: set(dependencies) for provider, dependencies in graph.items()}
+        ordered = []
+
+        while pending:
+            ready = [provider for provider, dependencies in pending.items() if not dependencies]
+            if not ready:
+                self.unresolvable_boot_order(pending)
+
+            for provider in ready:
+                del pending[provider]
+                ordered.append(provider)
+
+            for dependencies in pending.values():
+                dependencies.difference_update(ready)
+
+        return ordered
+
+    def unresolvable_boot_order(self, pending: BootGraph):
+        names = ', '.join(provider.__class__.__qualname__ for provider in pending)
+        raise RuntimeError("Circular boot dependency between [{0}]".format(names))
+
+    def boot_providers_concurrently(self, providers: List[ServiceProvider]) -> None:
+        """
+        Boot independent providers in parallel on a thread pool.
+        """
+        graph = self.get_boot_graph(providers)
+        self.sort_boot_graph(graph)
+
+        with ThreadPoolExecutor(max_workers=self.bootWorkers) as executor:
+            running = {}
+
+            while graph or running:
+                ready = [provider for provider, dependencies in graph.items() if not dependencies]
+                for provider in ready:
+                    del graph[provider]
+                    running[executor.submit(self.boot_provider_blocking, provider)] = provider
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = running.pop(future)
+                    future.result()
+
+                    for dependencies in graph.values():
+                        dependencies.discard(provider)
+
+    async def boot_providers_async(self, providers: List[ServiceProvider]) -> None:
+        """
+        Boot independent providers concurrently on the running event loop.
+        """
+        graph = self.get_boot_graph(providers)
+        loop = asyncio.get_running_loop()
+        tasks = {}
+
+        async def boot(provider: ServiceProvider):
+            await asyncio.gather(*(tasks[dependency] for dependency in graph[provider]))
+
+            if inspect.iscoroutinefunction(getattr(provider, 'boot', None)):
+                return await self.boot_provider(provider)
+
+            return await loop.run_in_executor(None, self.boot_provider, provider)
+
+        for provider in self.sort_boot_graph(graph):
+            tasks[provider] = asyncio.ensure_future(boot(provider))
+
+        await asyncio.gather(*tasks.values())
+
     def booting(self, callback: Callable):
         self.bootingCallbacks.append(callback)
 
@@ -179,6 +365,18 @@ class Kernel(Container):
     def is_deferred_service(self, service: ClassAnnotation):
         return service in self.deferredServices
 
+    def get_snapshot_attributes(self) -> List[str]:
+        return super().get_snapshot_attributes() + [
+            '_booted',
+            'hasBeenBootstrapped',
+            'serviceProviders',
+            'loadedProviders',
+            'deferredServices',
+            'providedServices',
+            'bootingCallbacks',
+            'bootedCallbacks',
+        ]
+
     def flush(self):
         super().flush()
 
@@ -189,6 +387,7 @@ class Kernel(Container):
         self.deferredServices = {}
         self.reboundCallbacks = {}
         self.serviceProviders = []
+        self.providedServices = {}
         self.resolvingCallbacks = {}
         self.afterResolvingCallbacks = {}
         self.globalResolvingCallbacks = {}
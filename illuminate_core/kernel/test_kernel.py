@@ -86,3 +86,156 @@ def test_service_provider():
 
     c.register(AServiceProvider)
     assert 123 == c.make('a')
+
+
+def test_concurrent_boot_respects_dependencies():
+    c = Kernel()
+    c.bootWorkers = 4
+    order = []
+
+    class CacheServiceProvider(ServiceProvider):
+        def register(self):
+            self.app.singleton('cache', lambda: {})
+
+        def boot(self):
+            order.append('cache')
+
+    class RouteServiceProvider(ServiceProvider):
+        depends = ['cache']
+
+        def boot(self):
+            order.append('route')
+
+    class ViewServiceProvider(ServiceProvider):
+        depends = [RouteServiceProvider]
+
+        def boot(self):
+            order.append('view')
+
+    c.register(ViewServiceProvider)
+    c.register(RouteServiceProvider)
+    c.register(CacheServiceProvider)
+    c.booting(lambda: order.append('booting'))
+    c.booted(lambda: order.append('booted'))
+    c.boot()
+
+    assert order == ['booting', 'cache', 'route', 'view', 'booted']
+
+
+def test_sequential_boot_respects_dependencies():
+    c = Kernel()
+    order = []
+
+    class AServiceProvider(ServiceProvider):
+        def boot(self):
+            order.append('A')
+
+    class BServiceProvider(ServiceProvider):
+        depends = [AServiceProvider]
+
+        def boot(self):
+            order.append('B')
+
+    c.register(BServiceProvider)
+    c.register(AServiceProvider)
+    c.boot()
+
+    assert order == ['A', 'B']
+
+
+def test_async_boot():
+    import asyncio
+
+    c = Kernel()
+    order = []
+
+    class PoolServiceProvider(ServiceProvider):
+        async def boot(self):
+            await asyncio.sleep(0)
+            order.append('pool')
+
+    class QueueServiceProvider(ServiceProvider):
+        depends = [PoolServiceProvider]
+
+        def boot(self):
+            order.append('queue')
+
+    c.register(QueueServiceProvider)
+    c.register(PoolServiceProvider)
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(c.boot_async())
+    loop.close()
+
+    assert order == ['pool', 'queue']
+    assert c.is_booted()
+
+
+def test_snapshot_restore_keeps_booted_providers():
+    c = Kernel()
+    booted = []
+
+    class AServiceProvider(ServiceProvider):
+        def register(self):
+            self.app.singleton('a', lambda: object())
+
+        def boot(self):
+            booted.append(self)
+
+    c.register(AServiceProvider)
+    c.boot()
+    a = c.make('a')
+    snapshot = c.snapshot()
+
+    c.singleton('job', lambda: object())
+    c.make('job')
+    c.forget_instance('a')
+    c.restore(snapshot)
+
+    assert c.is_booted()
+    assert c.make('a') is a
+    assert not c.bound('job')
+    assert len(booted) == 1
+
+
+def test_bootstrap_with_fires_events():
+    c = Kernel()
+    order = []
+
+    class Bootstrapper:
+        def bootstrap(self, app):
+            order.append('bootstrap')
+
+    c.before_bootstrapping(Bootstrapper, lambda app: order.append(('before', app is c)))
+    c.bootstrap_with([Bootstrapper])
+
+    assert order == [('before', True), 'bootstrap']
+    assert c.has_been_bootstrapped()
+
+
+def test_bootstrap_with_skips_event_names_without_listeners():
+    c = Kernel()
+    formatted = []
+
+    class Bootstrapper:
+        def bootstrap(self, app):
+            pass
+
+    class Name:
+        def __format__(self, spec):
+            formatted.append(spec)
+            return 'name'
+
+        def __call__(self, app):
+            return Bootstrapper()
+
+    assert not c.make('events').has_any_listeners()
+    c.bootstrap_with([Name()])
+    assert formatted == []
+
+
+def test_tenants_are_cached_on_the_kernel():
+    c = Kernel()
+    tenants = c.tenants(lambda overlay: overlay.instance('db', overlay.tenant), max_tenants=2)
+    assert tenants['a'].make('db') == 'a'
+    assert c.tenants() is tenants and 'a' in c.tenants()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Sequence
 from illuminate_core.contract.container import Container
 from illuminate_core.container.types import ClassAnnotation
 
@@ -6,6 +6,7 @@ from illuminate_core.container.types import ClassAnnotation
 class ServiceProvider:
     app: Container
     defer: bool = False
+    depends: Sequence[ClassAnnotation] = ()
 
     def __init__(self, app: Container):
         self.app = app
@@ -16,5 +17,11 @@ class ServiceProvider:
     def is_defered(self) -> bool:
         return self.defer
 
+    def boot_dependencies(self) -> Sequence[ClassAnnotation]:
+        """
+        Get the providers or services that must be booted before this provider.
+        """
+        return self.depends
+
     def register(self):
         pass
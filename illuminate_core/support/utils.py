@@ -4,5 +4,6 @@ from typing import Any, Callable
 
 def call_user_func(func: Callable, *args) -> Any:
     signature = inspect.signature(func)
-    args = args[0:len(signature.parameters)]
+    if not any(parameter.kind is parameter.VAR_POSITIONAL for parameter in signature.parameters.values()):
+        args = args[0:len(signature.parameters)]
     return func(*args)